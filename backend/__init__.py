@@ -4,16 +4,32 @@ import sys
 import os
 from flask import Flask
 from backend.extensions import bcrypt, db, migrate, mail
+from backend.jsonprovider import FastJSONProvider
+from backend.deployment import configure_deployment, reset_connections_after_fork
 
-def create_backend():
+def create_backend(config=None):
+    """
+    Create the application.
+
+    :param config: Optional mapping applied over ``.env``, e.g. to point
+        ``SQLALCHEMY_DATABASE_URI`` at an in-memory database
+    """
     app = Flask(__name__.split(".")[0])
+    app.json = FastJSONProvider(app)
     app.config.from_pyfile('../.env', silent=True)
+    if config:
+        app.config.update(config)
+    configure_deployment(app)
     
     # Ensure the instance folder exists
     os.makedirs(app.instance_path, exist_ok=True)
     
     register_extensions(app)
+    reset_connections_after_fork(app)
     register_blueprints(app)
+    register_metrics(app)
+    register_querylog(app)
+    register_commands(app)
     configure_logger(app)
     return app
 
@@ -36,6 +52,26 @@ def register_blueprints(app):
     app.register_blueprint(schedule_routes.bp, url_prefix='/api/schedule')
     return None
 
+def register_metrics(app):
+    from backend import metrics
+
+    metrics.init_app(app)
+    return None
+
+def register_querylog(app):
+    from backend import querylog
+
+    querylog.init_app(app)
+    return None
+
+def register_commands(app):
+    from backend import commands
+
+    app.cli.add_command(commands.import_sections)
+    app.cli.add_command(commands.send_mail)
+    app.cli.add_command(commands.calibrate_bcrypt)
+    return None
+
 def configure_logger(app):
     handler = logging.StreamHandler(sys.stdout)
     if not app.logger.handlers:
@@ -0,0 +1,165 @@
+"""Bearer-token authentication with a per-worker cache of verified principals."""
+import functools
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import current_app, g, jsonify, request
+from itsdangerous.exc import BadSignature, SignatureExpired
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from backend.extensions import db
+from backend.models.user import AUTH_TOKEN_MAX_AGE, User, auth_token_serializer
+
+Principal = namedtuple('Principal', ['id', 'email', 'role', 'verified'])
+Principal.__doc__ = """The authenticated caller of a request, as stored in ``g.principal``."""
+
+
+class PrincipalCache(object):
+    """
+    A small thread-safe LRU of principals with a time-to-live.
+
+    Changes made in this worker evict the affected entries as soon as they are
+    committed; changes made by another worker become visible here once the
+    entry expires, after at most ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0):
+        """Create instance."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the cached principal for ``user_id``, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal):
+        """Cache a principal, evicting the least recently used one if full."""
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_ids):
+        """Drop the entries for ``user_ids``."""
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+
+def principal_cache():
+    """Return the current app's principal cache, creating it on first use."""
+    cache = current_app.extensions.get('principal_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('principal_cache', PrincipalCache(
+            max_size=current_app.config.get('AUTH_CACHE_SIZE', 1024),
+            ttl=current_app.config.get('AUTH_CACHE_TTL', 60.0)
+        ))
+    return cache
+
+
+def authenticate(token):
+    """
+    Verify an authentication token and return its :class:`Principal`.
+
+    The signature check is pure CPU; the database is only consulted when the
+    user is not already in this worker's principal cache, and then only for
+    the four columns a principal needs.
+
+    :param token: The bearer token issued by ``User.generate_token``
+    :return: A Principal, or None if the token is invalid, expired or its user is gone
+    """
+    try:
+        data = auth_token_serializer().loads(token, max_age=AUTH_TOKEN_MAX_AGE)
+    except (SignatureExpired, BadSignature):
+        return None
+
+    cache = principal_cache()
+    principal = cache.get(data['id'])
+    if principal is None:
+        row = db.session.query(User.id, User.email, User.user_type, User.verified).filter(
+            User.id == data['id']
+        ).first()
+        if row is None:
+            return None
+        principal = Principal(row.id, row.email, row.user_type, bool(row.verified))
+        cache.put(principal)
+    return principal
+
+
+def auth_required(*roles):
+    """
+    Require a valid ``Authorization: Bearer`` token from a verified user.
+
+    The caller is available as ``g.principal`` inside the view.
+
+    Usage:
+        @bp.route('', methods=['GET'])
+        @auth_required(UserType.ADMIN, UserType.ROOT)
+        def get_queue():
+            ...
+
+    :param roles: The ``UserType`` values allowed to call the view; any role if empty
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(*args, **kwargs):
+            auth_header = request.headers.get('Authorization')
+            if not auth_header or not auth_header.startswith('Bearer '):
+                return jsonify({'message': 'Missing or invalid authorization header'}), 401
+
+            principal = authenticate(auth_header.split(' ')[1])
+            if not principal or not principal.verified or (roles and principal.role not in roles):
+                return jsonify({'message': 'Unauthorized access'}), 403
+
+            g.principal = principal
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def invalidate_principals(user_ids):
+    """Evict users from this worker's principal cache after a bulk change to them."""
+    cache = current_app.extensions.get('principal_cache')
+    if cache is not None:
+        cache.discard(user_ids)
+
+
+@event.listens_for(User.user_type, 'set')
+@event.listens_for(User.verified, 'set')
+def _remember_changed_user(target, value, oldvalue, initiator):
+    """Note users whose role or verified flag changes so they are evicted on commit."""
+    session = object_session(target)
+    if session is not None and target.id is not None and value != oldvalue:
+        session.info.setdefault('changed_principals', set()).add(target.id)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _remember_deleted_users(session, flush_context):
+    """Note deleted users so they are evicted on commit."""
+    deleted = [target.id for target in session.deleted if isinstance(target, User)]
+    if deleted:
+        session.info.setdefault('changed_principals', set()).update(deleted)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _evict_changed_users(session):
+    user_ids = session.info.pop('changed_principals', None)
+    if user_ids:
+        invalidate_principals(user_ids)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_changed_users(session):
+    session.info.pop('changed_principals', None)
@@ -0,0 +1,265 @@
+"""Per-worker, versioned in-memory snapshot of the course catalog."""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select, tuple_
+from backend.extensions import db
+from backend.models import Course, CourseSection, CatalogState
+from backend.responses import EncodedBody
+from backend.scheduling import MeetingIndex, compile_section
+from backend.serializers import select_rows
+
+# Fields of each catalog response, in the order the endpoints have always used
+COURSE_FIELDS = ('department_id', 'course_number', 'course_title')
+SECTION_FIELDS = (
+    'department_id', 'course_number', 'course_title', 'section_id',
+    'instructor', 'days', 'start_time', 'end_time'
+)
+LISTING_FIELDS = tuple(name for name in SECTION_FIELDS if name != 'course_title')
+RECORD_COLUMNS = SECTION_FIELDS + ('day_mask', 'start_minute', 'end_minute')
+
+
+def course_key(department_id, course_number):
+    """Normalize a (department_id, course_number) pair the way the database compares them."""
+    return (str(department_id).strip().upper(), str(course_number).strip())
+
+
+class SectionRecord(object):
+    """
+    A read-only copy of a ``CourseSection`` row with its JSON forms precomputed.
+
+    It exposes the same attributes as the model, so the schedule search can
+    treat records and ORM objects alike.
+    """
+
+    __slots__ = (
+        'department_id', 'course_number', 'course_title', 'section_id',
+        'instructor', 'days', 'start_time', 'end_time',
+        'day_mask', 'start_minute', 'end_minute',
+        'catalog_row', 'listing_row', 'schedule_row'
+    )
+
+    def __init__(self, department_id, course_number, course_title, section_id,
+                 instructor, days, start_time, end_time,
+                 day_mask=None, start_minute=None, end_minute=None):
+        """Create instance."""
+        self.department_id = department_id
+        self.course_number = course_number
+        self.course_title = course_title
+        self.section_id = section_id
+        self.instructor = instructor
+        self.days = days
+        self.start_time = start_time
+        self.end_time = end_time
+        self.day_mask = day_mask
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.listing_row = {
+            'department_id': department_id,
+            'course_number': course_number,
+            'section_id': section_id,
+            'instructor': instructor,
+            'days': days,
+            'start_time': start_time,
+            'end_time': end_time
+        }
+        self.catalog_row = dict(self.listing_row, course_title=course_title)
+        self.schedule_row = dict(self.listing_row, days=list(days))
+
+
+def section_records(*criteria):
+    """
+    Read ``CourseSection`` rows as :class:`SectionRecord` objects, in catalog order.
+
+    The columns are selected with Core, so no ORM objects are built.
+
+    :param criteria: Optional WHERE clauses
+    """
+    table = CourseSection.__table__
+    statement = select(*[table.c[name] for name in RECORD_COLUMNS]).order_by(table.c.id)
+    if criteria:
+        statement = statement.where(*criteria)
+    return [SectionRecord(*row) for row in db.session.execute(statement)]
+
+
+class CatalogSnapshot(object):
+    """
+    An immutable view of the catalog at one version.
+
+    Sections are grouped by course and compiled for the schedule search once,
+    when the snapshot is built, so read endpoints and schedule generation can
+    be answered without touching the database.
+    """
+
+    def __init__(self, version, course_rows, records):
+        """
+        Create instance.
+
+        :param version: The catalog version the rows were read at
+        :param course_rows: Serialized courses in catalog order
+        :param records: :class:`SectionRecord` objects in catalog order
+        """
+        self.version = version
+        self.course_rows = course_rows
+        self.section_rows = [record.catalog_row for record in records]
+        self.listing_rows = [record.listing_row for record in records]
+
+        self._records = {}
+        for record in records:
+            self._records.setdefault(course_key(record.department_id, record.course_number), []).append(record)
+
+        self._compiled = {}
+        self._errors = {}
+        for key, course_records in self._records.items():
+            try:
+                self._compiled[key] = tuple(compile_section(record) for record in course_records)
+            except ValueError as ve:
+                self._errors[key] = str(ve)
+
+        self._bodies = {}
+        self._bodies_lock = threading.Lock()
+        self._all_records = records
+        self._meeting_index = None
+
+    def encoded(self, name):
+        """
+        Return the serialized, compressible body for one of the snapshot's row lists.
+
+        :param name: ``'course_rows'``, ``'section_rows'`` or ``'listing_rows'``
+        :return: An :class:`EncodedBody`, built once per snapshot
+        """
+        body = self._bodies.get(name)
+        if body is None:
+            with self._bodies_lock:
+                body = self._bodies.get(name)
+                if body is None:
+                    body = self._bodies[name] = EncodedBody(getattr(self, name))
+        return body
+
+    def course_listing(self, department_id, course_number):
+        """Return the listing rows for one course's sections."""
+        records = self._records.get(course_key(department_id, course_number), ())
+        return [record.listing_row for record in records]
+
+    def compiled_sections(self, department_id, course_number):
+        """
+        Return a course's sections compiled for the schedule search.
+
+        :return: A tuple of :class:`CompiledSection`, empty if the course has no sections
+        :raises ValueError: If one of the course's sections has a malformed meeting time
+        """
+        key = course_key(department_id, course_number)
+        if key in self._errors:
+            raise ValueError(self._errors[key])
+        return self._compiled.get(key, ())
+
+    def meeting_index(self):
+        """Return the :class:`MeetingIndex` over every section's meetings, built once per snapshot."""
+        index = self._meeting_index
+        if index is None:
+            with self._bodies_lock:
+                index = self._meeting_index
+                if index is None:
+                    index = self._meeting_index = build_meeting_index(self._all_records)
+        return index
+
+    @staticmethod
+    def load(version):
+        """Read the whole catalog from the database into a new snapshot."""
+        return CatalogSnapshot(
+            version,
+            select_rows(Course, only=COURSE_FIELDS, order_by=Course.id),
+            section_records()
+        )
+
+
+def build_meeting_index(records):
+    """
+    Index section records by meeting day and time, in catalog order.
+
+    Sections whose meeting times cannot be parsed are left out.
+    """
+    compiled = []
+    for record in records:
+        try:
+            compiled.append(compile_section(record))
+        except ValueError:
+            continue
+    return MeetingIndex(compiled)
+
+
+def load_course_sections(courses):
+    """
+    Fetch the sections of several courses with one tuple-IN query.
+
+    Usage:
+        grouped = load_course_sections([('CPSC', '1375'), ('MATH', '1451')])
+        grouped[course_key('CPSC', '1375')]  # [SectionRecord, ...]
+
+    :param courses: An iterable of (department_id, course_number) pairs
+    :return: A dict mapping :func:`course_key` to the course's records in catalog order
+    """
+    keys = list({course_key(department_id, course_number) for department_id, course_number in courses})
+    grouped = {}
+    if not keys:
+        return grouped
+    records = section_records(tuple_(CourseSection.department_id, CourseSection.course_number).in_(keys))
+    for record in records:
+        grouped.setdefault(course_key(record.department_id, record.course_number), []).append(record)
+    return grouped
+
+
+class CatalogCache(object):
+    """Holds the current worker's snapshot and decides when to look for a newer one."""
+
+    def __init__(self):
+        """Create instance."""
+        self.snapshot = None
+        self.checked_at = float('-inf')
+        self.lock = threading.Lock()
+
+    def get(self, refresh_interval):
+        """Return a snapshot no more than ``refresh_interval`` seconds out of date."""
+        snapshot = self.snapshot
+        if snapshot is not None and time.monotonic() - self.checked_at < refresh_interval:
+            return snapshot
+
+        with self.lock:
+            if self.snapshot is not None and time.monotonic() - self.checked_at < refresh_interval:
+                return self.snapshot
+            # Read the version before the rows: if a save lands in between,
+            # the snapshot is labelled older than its contents and simply
+            # gets rebuilt on the next check.
+            version = CatalogState.current_version()
+            if self.snapshot is None or self.snapshot.version != version:
+                self.snapshot = CatalogSnapshot.load(version)
+                current_app.logger.info(f"Loaded catalog snapshot version {version}")
+            self.checked_at = time.monotonic()
+            return self.snapshot
+
+    def invalidate(self):
+        """Force the next :meth:`get` to check the catalog version."""
+        self.checked_at = float('-inf')
+
+
+def current_catalog():
+    """
+    Return this worker's catalog snapshot, or None when snapshots are disabled.
+
+    The stored catalog version is checked at most once every
+    ``CATALOG_REFRESH_INTERVAL`` seconds (default 2), so in steady state a
+    read costs no database round trip and a catalog saved by another worker
+    shows up within that interval. Set ``CATALOG_SNAPSHOT = False`` to always
+    read from the database instead.
+    """
+    if not current_app.config.get('CATALOG_SNAPSHOT', True):
+        return None
+    cache = current_app.extensions.setdefault('catalog_snapshot', CatalogCache())
+    return cache.get(current_app.config.get('CATALOG_REFRESH_INTERVAL', 2.0))
+
+
+def invalidate_catalog():
+    """Make this worker pick up a catalog change it just committed."""
+    cache = current_app.extensions.get('catalog_snapshot')
+    if cache is not None:
+        cache.invalidate()
@@ -0,0 +1,159 @@
+"""Streaming CSV import of course sections."""
+import csv
+from backend.extensions import db
+from backend.models import CourseSection, CatalogState
+
+# Header of the registrar's export, mapped to CourseSection columns
+CSV_COLUMNS = {
+    'Department ID': 'department_id',
+    'Course #': 'course_number',
+    'Course Title': 'course_title',
+    'Sec #': 'section_id',
+    'Instructor': 'instructor',
+    'Days': 'days',
+    'Start Time': 'start_time',
+    'End Time': 'end_time',
+}
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+DEFAULT_MAX_REJECTED_SHARE = 0.1
+
+
+class CatalogImportError(ValueError):
+    """
+    Raised when a CSV cannot be imported at all, e.g. because of a bad header.
+
+    When rows were read before the import was abandoned, ``report`` holds
+    the :class:`ImportReport` explaining why they were rejected.
+    """
+
+    def __init__(self, message, report=None):
+        """Create instance."""
+        super().__init__(message)
+        self.report = report
+
+
+class ImportReport(object):
+    """Outcome of an import: how many rows went in and why the others did not."""
+
+    def __init__(self):
+        """Create instance."""
+        self.inserted = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, line, error):
+        """Record a row that failed validation, keeping only the first few messages."""
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': error})
+
+    def to_json(self):
+        """Convert the report to a JSON-serializable dict."""
+        return {'inserted': self.inserted, 'rejected': self.rejected, 'errors': self.errors}
+
+
+def normalize_section_row(row):
+    """
+    Validate and normalize one section's fields.
+
+    :param row: A dict keyed by CourseSection column name
+    :return: A new dict ready to insert, including the normalized meeting columns
+    :raises ValueError: If a field is missing, too long or malformed
+    """
+    values = {}
+    for name in CSV_COLUMNS.values():
+        value = (row.get(name) or '').strip()
+        if not value:
+            raise ValueError(f"Missing value for {name}")
+        limit = CourseSection.__table__.c[name].type.length
+        if len(value) > limit:
+            raise ValueError(f"{name} is longer than {limit} characters")
+        values[name] = value
+
+    values['department_id'] = values['department_id'].upper()
+    values['days'] = values['days'].upper()
+    values.update(CourseSection.meeting_columns(values['days'], values['start_time'], values['end_time']))
+    return values
+
+
+def import_sections_csv(text_stream, replace=True, batch_size=DEFAULT_BATCH_SIZE,
+                        max_rejected_share=DEFAULT_MAX_REJECTED_SHARE):
+    """
+    Import course sections from a CSV in the registrar's export layout.
+
+    Rows are read one at a time and inserted in batches with a single
+    executemany per batch, so memory stays bounded by ``batch_size`` no
+    matter how large the file is. Invalid rows are skipped and reported
+    instead of aborting the import. Everything runs in one transaction,
+    committed at the end together with a catalog version bump.
+
+    A replace that would leave the catalog empty, or built from a file
+    whose rows were mostly rejected (e.g. times in the wrong format), is
+    rolled back, so a bad export never wipes the existing sections.
+
+    Usage:
+        with open('sections.csv', newline='', encoding='utf-8-sig') as f:
+            report = import_sections_csv(f)
+
+    :param text_stream: A text-mode file object positioned at the header row
+    :param replace: Delete the existing sections first (default) or append to them
+    :param batch_size: Number of rows per INSERT batch
+    :param max_rejected_share: In replace mode, the largest share of rows that may be
+        rejected before the whole import is rolled back
+    :return: An :class:`ImportReport`
+    :raises CatalogImportError: If the header is missing required columns, or a
+        replace inserted nothing or rejected more than ``max_rejected_share`` of the rows
+    """
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is None:
+        raise CatalogImportError("The CSV file is empty")
+    header = [name.strip().lstrip('\ufeff') for name in header]
+    missing = [name for name in CSV_COLUMNS if name not in header]
+    if missing:
+        raise CatalogImportError(f"Missing CSV columns: {', '.join(missing)}")
+    positions = [(header.index(name), column) for name, column in CSV_COLUMNS.items()]
+
+    table = CourseSection.__table__
+    report = ImportReport()
+    batch = []
+    try:
+        if replace:
+            db.session.execute(table.delete())
+
+        for fields in reader:
+            if not any(field.strip() for field in fields):
+                continue
+            row = {column: fields[index] if index < len(fields) else '' for index, column in positions}
+            try:
+                batch.append(normalize_section_row(row))
+            except ValueError as ve:
+                report.reject(reader.line_num, str(ve))
+                continue
+
+            if len(batch) >= batch_size:
+                db.session.execute(table.insert(), batch)
+                report.inserted += len(batch)
+                batch = []
+
+        if batch:
+            db.session.execute(table.insert(), batch)
+            report.inserted += len(batch)
+
+        if replace:
+            total = report.inserted + report.rejected
+            if not report.inserted:
+                raise CatalogImportError("No valid sections in the CSV; existing sections were kept", report)
+            if report.rejected > total * max_rejected_share:
+                raise CatalogImportError(
+                    f"Rejected {report.rejected} of {total} rows; existing sections were kept", report
+                )
+        if replace or report.inserted:
+            CatalogState.bump()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return report
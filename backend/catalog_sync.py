@@ -0,0 +1,76 @@
+"""Diff-based replacement of catalog tables."""
+from sqlalchemy import bindparam, select
+from backend.extensions import db
+
+CHUNK_SIZE = 1000
+
+
+class SyncResult(object):
+    """Counts of rows touched by :func:`replace_rows`."""
+
+    def __init__(self, inserted=0, updated=0, deleted=0):
+        """Create instance."""
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+
+    @property
+    def changed(self):
+        """Whether anything was written."""
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def to_json(self):
+        """Convert the counts to a JSON-serializable dict."""
+        return {'inserted': self.inserted, 'updated': self.updated, 'deleted': self.deleted}
+
+
+def replace_rows(table, key_columns, rows):
+    """
+    Make ``table`` contain exactly ``rows`` by writing only the differences.
+
+    Current rows are matched to incoming ones on ``key_columns``. When a key
+    occurs several times, rows are paired in id order. Matched rows whose
+    other columns differ are updated, unmatched incoming rows inserted and
+    unmatched current rows deleted, each as one batched statement. Nothing
+    is committed; the caller owns the transaction.
+
+    Usage:
+        result = replace_rows(Course.__table__, ('department_id', 'course_number'), rows)
+
+    :param table: The Core ``Table`` to update
+    :param key_columns: Column names identifying a row
+    :param rows: Dicts holding every column except ``id``, in the desired order
+    :return: A :class:`SyncResult`
+    """
+    value_columns = [name for name in rows[0] if name not in key_columns] if rows else []
+
+    incoming = {}
+    for row in rows:
+        incoming.setdefault(tuple(row[name] for name in key_columns), []).append(row)
+
+    current_columns = [table.c.id] + [table.c[name] for name in key_columns] + [table.c[name] for name in value_columns]
+    key_width = len(key_columns)
+    inserts, updates, deletes = [], [], []
+    for record in db.session.execute(select(*current_columns).order_by(table.c.id)):
+        key = tuple(record[1:1 + key_width])
+        matches = incoming.get(key)
+        if not matches:
+            deletes.append(record[0])
+            continue
+        row = matches.pop(0)
+        if tuple(record[1 + key_width:]) != tuple(row[name] for name in value_columns):
+            updates.append(dict({'row_id': record[0]}, **{name: row[name] for name in value_columns}))
+    for remaining in incoming.values():
+        inserts.extend(remaining)
+
+    for start in range(0, len(deletes), CHUNK_SIZE):
+        db.session.execute(table.delete().where(table.c.id.in_(deletes[start:start + CHUNK_SIZE])))
+    if updates:
+        statement = table.update().where(table.c.id == bindparam('row_id')).values(
+            {name: bindparam(name) for name in value_columns}
+        )
+        db.session.execute(statement, updates)
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+
+    return SyncResult(inserted=len(inserts), updated=len(updates), deleted=len(deletes))
@@ -0,0 +1,68 @@
+"""Click commands."""
+import time
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('import-sections')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--append', is_flag=True, help='Keep the existing sections instead of replacing them.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per INSERT batch.')
+@with_appcontext
+def import_sections(csv_path, append, batch_size):
+    """Import course sections from a registrar CSV export."""
+    from backend.catalog_import import CatalogImportError, import_sections_csv
+
+    with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+        try:
+            report = import_sections_csv(csv_file, replace=not append, batch_size=batch_size)
+        except CatalogImportError as e:
+            if e.report is not None:
+                for error in e.report.errors:
+                    click.echo(f"  line {error['line']}: {error['error']}", err=True)
+            raise click.ClickException(str(e))
+
+    click.echo(f"Imported {report.inserted} sections, rejected {report.rejected}.")
+    for error in report.errors:
+        click.echo(f"  line {error['line']}: {error['error']}", err=True)
+
+
+@click.command('send-mail')
+@click.option('--once', is_flag=True, help='Send one batch and exit instead of polling.')
+@click.option('--interval', default=5.0, show_default=True, help='Seconds between polls when idle.')
+@click.option('--batch-size', default=50, show_default=True, help='Messages per SMTP connection.')
+@with_appcontext
+def send_mail(once, interval, batch_size):
+    """
+    Drain the email outbox.
+
+    For local testing, point MAIL_SERVER/MAIL_PORT at a stand-in SMTP server
+    such as ``python -m aiosmtpd -n -l localhost:8025``.
+    """
+    from backend.extensions import db
+    from backend.mailer import send_pending
+
+    while True:
+        try:
+            delivered = send_pending(batch_size)
+        finally:
+            db.session.remove()
+        if delivered:
+            click.echo(f"Sent {delivered} messages.")
+        if once:
+            return
+        if not delivered:
+            time.sleep(interval)
+
+
+@click.command('calibrate-bcrypt')
+@click.option('--target-ms', default=250.0, show_default=True, help='Acceptable time for one hash.')
+@with_appcontext
+def calibrate_bcrypt(target_ms):
+    """Pick the bcrypt cost (BCRYPT_LOG_ROUNDS) that fits a latency target on this machine."""
+    from backend.passwords import calibrate, configured_cost
+
+    chosen, timings = calibrate(target_ms)
+    for cost, elapsed in timings:
+        click.echo(f"cost {cost:2d}: {elapsed:8.1f} ms")
+    click.echo(f"Recommended BCRYPT_LOG_ROUNDS = {chosen} (currently {configured_cost()})")
@@ -1,6 +1,6 @@
 """Database module, including the SQLAlchemy database object and DB-related utilities."""
 from .extensions import db
-from sqlalchemy import inspect
+from .serializers import serialize
 
 class accessControlColumn(db.Column):
     isPrivate = False
@@ -51,12 +51,8 @@ class Model(CRUDMixin, db.Model):
     __abstract__ = True
 
     def getAttributes(self,returnisPrivate=False,**kwargs):
-        if returnisPrivate:
-            attr = {column.name.lower(): getattr(self,column.name) for column in inspect(self).mapper.c if not column.isInternal}
-            attr = dict(attr,**kwargs) #unpack KWARGS onto attr
-        else:
-            attr = {column.name.lower(): getattr(self,column.name) for column in inspect(self).mapper.c if not (column.isPrivate or column.isInternal)}
-            attr = dict(attr,**kwargs)
+        attr = serialize(self, private=returnisPrivate) #field plan is built once per class
+        attr.update(kwargs) #unpack KWARGS onto attr
         return attr
 
 # From Mike Bayer's "Building the app" talk
@@ -0,0 +1,114 @@
+"""Deployment profiles tying the gunicorn worker model to matching database pool settings."""
+import multiprocessing
+import os
+import weakref
+from collections import namedtuple
+
+PROFILES = ('sync', 'gthread', 'gevent')
+
+DeploymentProfile = namedtuple(
+    'DeploymentProfile', ['name', 'worker_class', 'workers', 'threads', 'worker_connections']
+)
+DeploymentProfile.__doc__ = """How many gunicorn workers to run and how much concurrency each one has."""
+
+
+def current_profile(environ=None):
+    """
+    Build the deployment profile selected by ``GUNICORN_PROFILE``.
+
+    - ``sync`` (default): ``2 * cpus + 1`` single-threaded workers.
+    - ``gthread``: ``cpus + 1`` workers with ``GUNICORN_THREADS`` (4) threads each.
+    - ``gevent``: ``cpus`` workers with ``GUNICORN_WORKER_CONNECTIONS`` (100) greenlets each.
+      gevent is an optional Pipfile category; install it with
+      ``pipenv install --categories "packages gevent"``.
+
+    ``GUNICORN_WORKERS``, ``GUNICORN_THREADS`` and ``GUNICORN_WORKER_CONNECTIONS``
+    override the defaults.
+
+    :raises ValueError: If the profile name is unknown
+    """
+    environ = os.environ if environ is None else environ
+    name = environ.get('GUNICORN_PROFILE', 'sync').strip().lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown GUNICORN_PROFILE {name!r}, expected one of {', '.join(PROFILES)}")
+
+    cpus = multiprocessing.cpu_count()
+    default_workers = {'sync': cpus * 2 + 1, 'gthread': cpus + 1, 'gevent': cpus}[name]
+    return DeploymentProfile(
+        name=name,
+        worker_class=name,
+        workers=int(environ.get('GUNICORN_WORKERS', default_workers)),
+        threads=int(environ.get('GUNICORN_THREADS', 4)) if name == 'gthread' else 1,
+        worker_connections=int(environ.get('GUNICORN_WORKER_CONNECTIONS', 100)) if name == 'gevent' else None
+    )
+
+
+def engine_options(profile, environ=None):
+    """
+    SQLAlchemy engine options sized for one worker of ``profile``.
+
+    The pool holds one connection per request a worker can serve at once
+    (capped at ``DB_MAX_CONNECTIONS_PER_WORKER``, 20, for gevent) plus
+    ``DB_MAX_OVERFLOW`` (2) for background threads. Requests beyond that
+    wait up to ``DB_POOL_TIMEOUT`` seconds rather than opening more
+    connections, so ``workers * (pool_size + max_overflow)`` bounds the
+    connections the deployment can open. ``DB_POOL_SIZE`` overrides the pool size.
+    """
+    environ = os.environ if environ is None else environ
+    if profile.name == 'gthread':
+        concurrency = profile.threads
+    elif profile.name == 'gevent':
+        concurrency = min(profile.worker_connections, int(environ.get('DB_MAX_CONNECTIONS_PER_WORKER', 20)))
+    else:
+        concurrency = 1
+    return {
+        'pool_size': int(environ.get('DB_POOL_SIZE', concurrency)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 2)),
+        'pool_timeout': int(environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+
+
+def configure_deployment(app):
+    """
+    Apply the current profile's defaults to ``app.config``.
+
+    Explicit settings from the config file win. SQLite URLs keep
+    Flask-SQLAlchemy's own pool choice, since its single-connection pools
+    do not accept sizing options.
+    """
+    profile = current_profile()
+    app.config.setdefault('DEPLOYMENT_PROFILE', profile.name)
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if not uri.startswith('sqlite'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(profile))
+    # Offloading bcrypt only helps when real threads share the worker
+    app.config.setdefault('BCRYPT_EXECUTOR', profile.name == 'gthread')
+    app.config.setdefault('BCRYPT_THREADS', max(1, profile.threads // 2))
+
+
+def reset_connections_after_fork(app):
+    """
+    Drop pooled connections a forked worker inherited from the gunicorn master.
+
+    With ``preload_app`` the app, and possibly open connections, are created
+    before forking; sharing those sockets between processes corrupts the
+    MySQL protocol. ``dispose(close=False)`` gives the child a fresh pool
+    without closing the parent's connections.
+    """
+    if not hasattr(os, 'register_at_fork'):
+        return
+    app_ref = weakref.ref(app)
+
+    def reset():
+        from backend.extensions import db
+
+        forked_app = app_ref()
+        if forked_app is None:
+            return
+        with forked_app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=reset)
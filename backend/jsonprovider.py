@@ -0,0 +1,46 @@
+"""Flask JSON provider backed by orjson when it is installed."""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Installed from the Pipfile; without it the standard library encoder is used
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    A drop-in for Flask's default provider that encodes with orjson.
+
+    Output matches the default provider: keys are sorted when ``sort_keys``
+    is set, and dates still go through Flask's ``default`` so they keep the
+    HTTP date format. Pretty-printed debug output and calls with extra
+    ``json.dumps`` arguments fall back to the standard library.
+    """
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps_bytes(self, obj):
+        """Serialize ``obj`` to UTF-8 encoded JSON bytes."""
+        if orjson is None:
+            return super().dumps(obj).encode('utf-8')
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,155 @@
+"""Transactional email outbox and the background sender that drains it."""
+import datetime as dt
+import threading
+from flask import current_app
+from flask_mail import Message
+from backend.extensions import db, mail
+from backend.models import EmailOutbox, OutboxStatus
+
+_sender_lock = threading.Lock()
+
+
+def queue_verification_email(email, token):
+    """
+    Add a verification email to the outbox as part of the current transaction.
+
+    Nothing is sent here; the email goes out once the caller commits and the
+    outbox sender picks it up.
+
+    :param email: The recipient's email address
+    :param token: The verification token
+    :return: The new :class:`EmailOutbox` row
+    """
+    verification_url = f'http://innovaid.dev/api/user/verify/{token}'
+    message = EmailOutbox(
+        recipient=email,
+        subject='Please click the below link to verify your email.',
+        body=f'Click the link to verify your email: {verification_url}'
+    )
+    db.session.add(message)
+    return message
+
+
+def send_pending(batch_size=None):
+    """
+    Deliver one batch of due outbox messages over a single SMTP connection.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+    database supports it, so several senders can run side by side. Failed
+    deliveries are retried with exponential backoff, configured by
+    ``MAIL_MAX_ATTEMPTS``, ``MAIL_RETRY_BASE_DELAY`` and ``MAIL_RETRY_MAX_DELAY``.
+
+    :param batch_size: Messages per batch, defaulting to ``MAIL_OUTBOX_BATCH_SIZE``
+    :return: The number of messages delivered
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get('MAIL_OUTBOX_BATCH_SIZE', 50)
+    retry = {
+        'max_attempts': config.get('MAIL_MAX_ATTEMPTS', 8),
+        'base_delay': config.get('MAIL_RETRY_BASE_DELAY', 30),
+        'max_delay': config.get('MAIL_RETRY_MAX_DELAY', 3600),
+    }
+
+    batch = EmailOutbox.query.filter(
+        EmailOutbox.status == OutboxStatus.PENDING,
+        EmailOutbox.next_attempt_at <= dt.datetime.utcnow()
+    ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not batch:
+        db.session.commit()
+        return 0
+
+    delivered = 0
+    processed = 0
+    try:
+        with mail.connect() as connection:
+            for outgoing in batch:
+                processed += 1
+                try:
+                    connection.send(Message(
+                        outgoing.subject,
+                        sender=config['MAIL_USERNAME'],
+                        recipients=[outgoing.recipient],
+                        body=outgoing.body
+                    ))
+                    outgoing.mark_sent()
+                    delivered += 1
+                except Exception as e:
+                    current_app.logger.warning(f"Failed to send outbox message {outgoing.id}: {str(e)}")
+                    outgoing.mark_failed(e, **retry)
+    except Exception as e:
+        # Connecting (or the connection itself) failed: retry whatever was not sent.
+        current_app.logger.error(f"SMTP connection failed: {str(e)}")
+        for outgoing in batch[processed:]:
+            outgoing.mark_failed(e, **retry)
+
+    db.session.commit()
+    return delivered
+
+
+class OutboxSender(threading.Thread):
+    """
+    A daemon thread that drains the outbox for one app.
+
+    It sleeps ``interval`` seconds between empty polls and can be woken
+    early with :meth:`notify` after a message is committed.
+    """
+
+    def __init__(self, app, interval=5.0):
+        """Create instance."""
+        super().__init__(name='outbox-sender', daemon=True)
+        self.app = app
+        self.interval = interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def notify(self):
+        """Wake the sender so new messages go out without waiting for the next poll."""
+        self._wakeup.set()
+
+    def stop(self):
+        """Ask the sender to finish its current batch and exit."""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            with self.app.app_context():
+                try:
+                    delivered = send_pending()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Outbox sender failed")
+                    delivered = 0
+                finally:
+                    db.session.remove()
+            if not delivered:
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+
+
+def start_outbox_sender(app):
+    """
+    Start ``app``'s outbox sender thread in this process if it is not running.
+
+    ``MAIL_OUTBOX_THREAD`` (True) turns the in-worker sender on; set it to
+    False when a separate ``flask send-mail`` process drains the outbox.
+
+    :return: The running :class:`OutboxSender`, or None when disabled
+    """
+    if not app.config.get('MAIL_OUTBOX_THREAD', True):
+        return None
+    with _sender_lock:
+        sender = app.extensions.get('outbox_sender')
+        if sender is None or not sender.is_alive():
+            sender = app.extensions['outbox_sender'] = OutboxSender(
+                app, interval=app.config.get('MAIL_OUTBOX_INTERVAL', 5.0)
+            )
+            sender.start()
+    return sender
+
+
+def notify_outbox():
+    """Wake this worker's outbox sender thread, starting it on first use if enabled."""
+    sender = start_outbox_sender(current_app._get_current_object())
+    if sender is not None:
+        sender.notify()
@@ -0,0 +1,120 @@
+"""Per-request Prometheus metrics and the /metrics endpoint.
+
+Under gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty directory
+before the server starts; every worker then writes its samples there and
+``/metrics`` aggregates all of them, whichever worker serves the scrape.
+"""
+import os
+import time
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request.', ['endpoint', 'method']
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total', 'Requests handled.', ['endpoint', 'method', 'status']
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Size of response bodies.', ['endpoint'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+DB_STATEMENTS = Histogram(
+    'http_request_db_statements', 'SQL statements executed per request.', ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+)
+DB_TIME = Histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request.', ['endpoint'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+SCHEDULE_SEARCH_NODES = Histogram(
+    'schedule_search_nodes', 'Sections placed while searching for schedules.', ['mode'],
+    buckets=(10, 100, 1000, 10000, 100000, 1000000, 10000000)
+)
+SCHEDULE_RESULTS = Histogram(
+    'schedule_results', 'Schedules returned per generate request.', ['mode'],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+)
+
+SCHEDULE_CACHE = Counter(
+    'schedule_cache_lookups_total', 'Schedule result cache lookups by outcome.', ['result']
+)
+
+
+def record_schedule_cache(result):
+    """Count a result cache lookup as ``'memory'`` or ``'disk'`` (hits) or ``'miss'``."""
+    SCHEDULE_CACHE.labels(result).inc()
+
+
+def record_schedule_search(mode, nodes, results):
+    """
+    Record the size and outcome of one schedule search.
+
+    :param mode: How the request was answered, e.g. ``'list'``, ``'stream'`` or ``'ranked'``
+    :param nodes: Sections placed during the search
+    :param results: Schedules returned to the client
+    """
+    SCHEDULE_SEARCH_NODES.labels(mode).observe(nodes)
+    SCHEDULE_RESULTS.labels(mode).observe(results)
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.db_statements = 0
+    g.db_seconds = 0.0
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    endpoint = _endpoint()
+    REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+    REQUEST_COUNT.labels(endpoint, request.method, str(response.status_code)).inc()
+    if not response.is_streamed:
+        RESPONSE_SIZE.labels(endpoint).observe(response.calculate_content_length() or 0)
+    DB_STATEMENTS.labels(endpoint).observe(g.get('db_statements', 0))
+    DB_TIME.labels(endpoint).observe(g.get('db_seconds', 0.0))
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if has_request_context() and 'db_statements' in g:
+        g.db_statements += 1
+        g.db_seconds += elapsed
+
+
+def metrics_view():
+    """Expose all metrics in the Prometheus text format."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """Install the request hooks, the SQL statement listeners and the /metrics route."""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,5 +1,10 @@
 from backend.models.user import User, RegistrationQueue
 from backend.models.course import Course
 from backend.models.coursesection import CourseSection
+from backend.models.catalog import CatalogState
+from backend.models.outbox import EmailOutbox, OutboxStatus
 
-__all__ = ['User', 'RegistrationQueue', 'Course', 'CourseSection']
\ No newline at end of file
+__all__ = [
+    'User', 'RegistrationQueue', 'Course', 'CourseSection', 'CatalogState',
+    'EmailOutbox', 'OutboxStatus'
+]
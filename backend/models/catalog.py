@@ -0,0 +1,34 @@
+from backend.database import Model, SurrogatePK, Column
+from backend.extensions import db
+
+
+class CatalogState(Model, SurrogatePK):
+    """Catalog state model holding the version bumped on every catalog change."""
+    __tablename__ = 'catalog_state'
+
+    STATE_ID = 1
+
+    version = Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def current_version(cls):
+        """
+        Return the current catalog version.
+
+        Usage:
+            if CatalogState.current_version() != snapshot.version:
+                rebuild()
+
+        :return: The version number, or 0 if the catalog was never saved
+        """
+        version = db.session.query(cls.version).filter_by(id=cls.STATE_ID).scalar()
+        return version or 0
+
+    @classmethod
+    def bump(cls):
+        """Increment the catalog version as part of the current transaction."""
+        updated = cls.query.filter_by(id=cls.STATE_ID).update(
+            {cls.version: cls.version + 1}, synchronize_session=False
+        )
+        if not updated:
+            db.session.add(cls(id=cls.STATE_ID, version=1))
@@ -1,5 +1,6 @@
 from backend.database import Model, SurrogatePK, Column
 from backend.extensions import db
+from backend.scheduling.timegrid import parse_days, parse_time
 
 class CourseSection(Model, SurrogatePK):
     """Course Section model."""
@@ -13,9 +14,18 @@ class CourseSection(Model, SurrogatePK):
     days = Column(db.String(5), nullable=False)  # e.g., "MWF"
     start_time = Column(db.String(10), nullable=False)  # Format: HHMM
     end_time = Column(db.String(10), nullable=False)    # Format: HHMM
+    # Normalized copies of the meeting fields, written on save
+    day_mask = Column(db.SmallInteger, nullable=True)      # bit i set for day i of "MTWRFSU"
+    start_minute = Column(db.SmallInteger, nullable=True)  # minutes since midnight
+    end_minute = Column(db.SmallInteger, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_course_sections_course', 'department_id', 'course_number'),
+    )
 
     def __init__(self, department_id, course_number, section_id, instructor, 
                  days, start_time, end_time, **kwargs):
+        kwargs.update(self.meeting_columns(days, start_time, end_time))
         db.Model.__init__(self, department_id=department_id, 
                          course_number=course_number,
                          section_id=section_id,
@@ -24,3 +34,25 @@ class CourseSection(Model, SurrogatePK):
                          start_time=start_time,
                          end_time=end_time,
                          **kwargs)
+
+    @staticmethod
+    def meeting_columns(days, start_time, end_time):
+        """
+        Validate a meeting and return its normalized integer columns.
+
+        Usage:
+            CourseSection.meeting_columns('MW', '0800', '0915')
+            # {'day_mask': 5, 'start_minute': 480, 'end_minute': 555}
+
+        :raises ValueError: If the days or times are malformed, or the meeting ends before it starts
+        """
+        columns = {
+            'day_mask': parse_days(days),
+            'start_minute': parse_time(start_time),
+            'end_minute': parse_time(end_time)
+        }
+        if not columns['day_mask']:
+            raise ValueError("Meeting days must not be empty")
+        if columns['end_minute'] <= columns['start_minute']:
+            raise ValueError("end_time must be after start_time")
+        return columns
@@ -0,0 +1,54 @@
+from backend.database import Model, SurrogatePK, Column
+from backend.extensions import db
+import enum
+import datetime as dt
+
+class OutboxStatus(enum.Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+class EmailOutbox(Model, SurrogatePK):
+    """Outgoing email waiting to be delivered by the outbox sender."""
+    __tablename__ = 'email_outbox'
+
+    recipient = Column(db.String(80), nullable=False, isPrivate=True)
+    subject = Column(db.String(200), nullable=False)
+    body = Column(db.Text, nullable=False)
+    status = Column(db.Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = Column(db.DateTime, nullable=False, default=dt.datetime.utcnow)
+    last_error = Column(db.Text, nullable=True, isInternal=True)
+    created_at = Column(db.DateTime, nullable=False, default=dt.datetime.utcnow)
+    sent_at = Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_due', 'status', 'next_attempt_at'),
+    )
+
+    def __init__(self, recipient, subject, body, **kwargs):
+        """Create instance."""
+        super().__init__(recipient=recipient, subject=subject, body=body, **kwargs)
+
+    def mark_sent(self):
+        """Record a successful delivery."""
+        self.status = OutboxStatus.SENT
+        self.sent_at = dt.datetime.utcnow()
+        self.last_error = None
+
+    def mark_failed(self, error, max_attempts, base_delay, max_delay):
+        """
+        Record a failed delivery and schedule the next attempt with exponential backoff.
+
+        :param error: The exception or message describing the failure
+        :param max_attempts: Attempts after which the message is given up on
+        :param base_delay: Seconds to wait after the first failure
+        :param max_delay: Upper bound on the wait between attempts, in seconds
+        """
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= max_attempts:
+            self.status = OutboxStatus.FAILED
+            return
+        delay = min(max_delay, base_delay * 2 ** (self.attempts - 1))
+        self.next_attempt_at = dt.datetime.utcnow() + dt.timedelta(seconds=delay)
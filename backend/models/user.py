@@ -1,11 +1,29 @@
 from backend.database import Model, SurrogatePK, Column
-from backend.extensions import db, bcrypt
+from backend.extensions import db
+from backend import passwords
 import enum
 from flask import current_app
 from itsdangerous import URLSafeTimedSerializer
 from itsdangerous.exc import SignatureExpired, BadSignature
 import datetime as dt
 
+AUTH_TOKEN_MAX_AGE = 900  # 15 minutes
+
+_auth_serializers = {}
+
+def auth_token_serializer():
+    """
+    Return the serializer for authentication tokens, built once per secret key.
+
+    Usage:
+        data = auth_token_serializer().loads(token, max_age=AUTH_TOKEN_MAX_AGE)
+    """
+    secret_key = current_app.config['SECRET_KEY']
+    serializer = _auth_serializers.get(secret_key)
+    if serializer is None:
+        serializer = _auth_serializers[secret_key] = URLSafeTimedSerializer(secret_key, salt='auth-token')
+    return serializer
+
 class UserType(enum.Enum):
     STUDENT = "STUDENT"
     ROOT = "ROOT"
@@ -24,6 +42,10 @@ class RegistrationQueue(Model, SurrogatePK):
     user_id = Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
     user = db.relationship('User', backref=db.backref('registration_request', uselist=False))
 
+    __table_args__ = (
+        db.Index('ix_registration_queue_pending', 'approved', 'id'),
+    )
+
     def __init__(self, user, request_type, **kwargs):
         """Create instance."""
         super().__init__(user_id=user.id, request_type=request_type, **kwargs)
@@ -75,7 +97,7 @@ class User(Model, SurrogatePK):
         
         :param password: The plain text password to be hashed and stored
         """
-        self.password = bcrypt.generate_password_hash(password)
+        self.password = passwords.hash_password(password)
 
     def check_password(self, value):
         """
@@ -88,14 +110,15 @@ class User(Model, SurrogatePK):
         :param value: The password to check
         :return: True if the password is correct, False otherwise
         """
-        return bcrypt.check_password_hash(self.password, value)
+        return passwords.check_password(self.password, value)
+
+    def password_needs_rehash(self):
+        """Check whether the stored hash was made with a stale bcrypt cost."""
+        return passwords.needs_rehash(self.password)
 
-    def generate_token(self, expiration=900):
+    def generate_token(self, expiration=AUTH_TOKEN_MAX_AGE):
         """Generate a timed authentication token."""
-        serializer = URLSafeTimedSerializer(
-            current_app.config['SECRET_KEY'],
-            salt='auth-token'
-        )
+        serializer = auth_token_serializer()
         expiration_time = dt.datetime.utcnow() + dt.timedelta(seconds=expiration)
         token_data = {
             'id': self.id,
@@ -107,12 +130,8 @@ class User(Model, SurrogatePK):
     @staticmethod
     def check_token(token):
         """Verify an authentication token."""
-        serializer = URLSafeTimedSerializer(
-            current_app.config['SECRET_KEY'],
-            salt='auth-token'
-        )
         try:
-            data = serializer.loads(token, max_age=900)  # 15 minutes
+            data = auth_token_serializer().loads(token, max_age=AUTH_TOKEN_MAX_AGE)
             return User.query.get(data['id'])
         except (SignatureExpired, BadSignature):
             return None
@@ -0,0 +1,113 @@
+"""Password hashing with a configurable bcrypt cost and an optional bounded thread pool."""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from backend.extensions import bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _forget_executor():
+    # Pool threads do not survive fork(); a child must build its own pool.
+    global _executor
+    _executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_executor)
+
+
+def configured_cost():
+    """Return the bcrypt work factor set by ``BCRYPT_LOG_ROUNDS``."""
+    return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+
+
+def hash_cost(pw_hash):
+    """
+    Read the work factor out of a stored bcrypt hash.
+
+    Usage:
+        hash_cost(b'$2b$12$...')  # 12
+
+    :return: The cost, or None if the value is not a bcrypt hash
+    """
+    if isinstance(pw_hash, (bytes, bytearray)):
+        pw_hash = pw_hash.decode('ascii', 'ignore')
+    parts = (pw_hash or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(pw_hash):
+    """Whether a stored hash was made with a different cost than the configured one."""
+    return hash_cost(pw_hash) != configured_cost()
+
+
+def _run(function, *args):
+    """
+    Call ``function`` on the hashing pool when ``BCRYPT_EXECUTOR`` is enabled.
+
+    bcrypt releases the GIL, so under threaded workers the pool caps how many
+    hashes run at once (``BCRYPT_THREADS``, default 2) without blocking the
+    other request threads. Otherwise the call runs inline.
+    """
+    if not current_app.config.get('BCRYPT_EXECUTOR', False):
+        return function(*args)
+
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('BCRYPT_THREADS', 2),
+                    thread_name_prefix='bcrypt'
+                )
+    return _executor.submit(function, *args).result()
+
+
+def hash_password(password, rounds=None):
+    """
+    Hash a password with the configured (or given) bcrypt cost.
+
+    :param password: The plain text password
+    :param rounds: Override the work factor, e.g. when calibrating
+    :return: The bcrypt hash as bytes
+    """
+    return _run(bcrypt.generate_password_hash, password, rounds or configured_cost())
+
+
+def check_password(pw_hash, password):
+    """Check a plain text password against a stored bcrypt hash."""
+    return _run(bcrypt.check_password_hash, pw_hash, password)
+
+
+def calibrate(target_ms, min_cost=10, max_cost=16, samples=3):
+    """
+    Find the highest bcrypt cost whose hashing time stays within ``target_ms``.
+
+    Each cost is timed on this machine as the median of ``samples`` hashes;
+    every step up doubles the time, so the search stops at the first cost
+    that is too slow.
+
+    :return: A tuple of the chosen cost and a list of ``(cost, milliseconds)`` timings
+    """
+    timings = []
+    chosen = min_cost
+    for cost in range(min_cost, max_cost + 1):
+        durations = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.generate_password_hash('calibration-password', cost)
+            durations.append((time.perf_counter() - started) * 1000)
+        elapsed = sorted(durations)[len(durations) // 2]
+        timings.append((cost, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = cost
+    return chosen, timings
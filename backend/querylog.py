@@ -0,0 +1,158 @@
+"""Opt-in slow-query log and repeated-statement (N+1) detector.
+
+Meant for development and staging. Nothing is installed unless one of
+these settings is present:
+
+- ``SQL_SLOW_QUERY_MS``: log statements slower than this many milliseconds,
+  with their parameters and the application line that issued them.
+- ``SQL_REPEAT_THRESHOLD``: warn when one request runs the same statement
+  shape more than this many times.
+- ``SQL_EXPLAIN_SLOW``: also log the query plan of slow SELECTs
+  (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on MySQL).
+"""
+import os
+import re
+import sys
+import time
+from collections import Counter
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from backend.extensions import db
+
+MAX_PARAMS_LENGTH = 500
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_PLACEHOLDER_LIST = re.compile(r'\(\s*' + _PLACEHOLDER + r'(?:\s*,\s*' + _PLACEHOLDER + r')*\s*\)')
+_TUPLE_LIST = re.compile(r'\(\s*\(\?\)(?:\s*,\s*\(\?\))+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+EXPLAIN_PREFIX = {'sqlite': 'EXPLAIN QUERY PLAN ', 'mysql': 'EXPLAIN '}
+
+
+def statement_shape(statement):
+    """
+    Reduce a SQL statement to its shape so repeats with different values compare equal.
+
+    Literals become ``?`` and placeholder lists of any length collapse to
+    ``(?)`` (tuple lists to ``((?))``), so ``IN (?, ?, ?)`` and ``IN (?)``
+    count as the same statement.
+    """
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    shape = _TUPLE_LIST.sub('((?))', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def call_site():
+    """Return ``file:line in function`` for the innermost application frame running a query."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_BACKEND_DIR) and filename != _THIS_FILE:
+            relative = os.path.relpath(filename, os.path.dirname(_BACKEND_DIR))
+            return f'{relative}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+def _format_params(parameters):
+    text = repr(parameters)
+    if len(text) > MAX_PARAMS_LENGTH:
+        text = text[:MAX_PARAMS_LENGTH] + '...'
+    return text
+
+
+def explain(conn, statement, parameters):
+    """
+    Fetch the query plan for ``statement`` on the same DBAPI connection.
+
+    Uses a fresh raw cursor so the caller's cursor and results are left alone.
+    Returns ``None`` for dialects without a known EXPLAIN form.
+    """
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None:
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('querylog_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('querylog_started')
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    if not has_app_context():
+        return
+    config = current_app.config
+
+    if has_request_context() and 'sql_shapes' in g:
+        shape = statement_shape(statement)
+        g.sql_shapes[shape] += 1
+        if shape not in g.sql_sites:
+            g.sql_sites[shape] = call_site()
+
+    slow_ms = config.get('SQL_SLOW_QUERY_MS')
+    if slow_ms is None or elapsed_ms < float(slow_ms):
+        return
+
+    current_app.logger.warning(
+        'Slow query (%.1f ms) at %s: %s; params=%s',
+        elapsed_ms, call_site(), _WHITESPACE.sub(' ', statement), _format_params(parameters)
+    )
+    if config.get('SQL_EXPLAIN_SLOW') and not executemany and statement.lstrip()[:6].upper() == 'SELECT':
+        try:
+            plan = explain(conn, statement, parameters)
+        except Exception as e:
+            current_app.logger.warning('EXPLAIN failed: %s', str(e))
+            return
+        if plan is not None:
+            current_app.logger.warning('Query plan:\n%s', '\n'.join(str(row) for row in plan))
+
+
+def _start_request():
+    g.sql_shapes = Counter()
+    g.sql_sites = {}
+
+
+def _report_repeats(exc):
+    shapes = g.pop('sql_shapes', None)
+    sites = g.pop('sql_sites', {})
+    threshold = current_app.config.get('SQL_REPEAT_THRESHOLD')
+    if not shapes or threshold is None:
+        return
+    for shape, count in shapes.most_common():
+        if count <= int(threshold):
+            break
+        current_app.logger.warning(
+            'Possible N+1: %s %s ran the same statement %d times (first at %s): %s',
+            request.method, request.path, count, sites.get(shape, 'unknown'), shape
+        )
+
+
+def init_app(app):
+    """Attach the query listeners to this app's engines if any query logging is configured."""
+    config = app.config
+    if config.get('SQL_SLOW_QUERY_MS') is None and config.get('SQL_REPEAT_THRESHOLD') is None:
+        return
+
+    app.before_request(_start_request)
+    app.teardown_request(_report_repeats)
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
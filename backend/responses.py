@@ -0,0 +1,92 @@
+"""Conditional, pre-compressed JSON responses for large read-mostly payloads."""
+import gzip
+import hashlib
+import threading
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Installed from the Pipfile; without it only gzip is offered
+    brotli = None
+
+
+class EncodedBody(object):
+    """
+    A JSON body serialized once, with its ETag and compressed variants.
+
+    Compressed variants are built the first time a client asks for them and
+    then reused for as long as the body is, which for catalog bodies is the
+    lifetime of a catalog version.
+    """
+
+    def __init__(self, payload):
+        """
+        Create instance.
+
+        :param payload: Any JSON-serializable value
+        """
+        dumps_bytes = getattr(current_app.json, 'dumps_bytes', None)
+        if dumps_bytes is not None:
+            self.identity = dumps_bytes(payload)
+        else:
+            self.identity = current_app.json.dumps(payload).encode('utf-8')
+        self.etag = hashlib.sha256(self.identity).hexdigest()[:32]
+        self._variants = {'identity': self.identity}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding):
+        """Return the body encoded with ``'identity'``, ``'gzip'`` or ``'br'``."""
+        body = self._variants.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._variants.get(encoding)
+                if body is None:
+                    if encoding == 'gzip':
+                        body = gzip.compress(self.identity, compresslevel=9)
+                    else:
+                        body = brotli.compress(self.identity, quality=11)
+                    self._variants[encoding] = body
+        return body
+
+    def variant_etag(self, encoding):
+        """Return the strong ETag of one encoded variant."""
+        return self.etag if encoding == 'identity' else f'{self.etag}-{encoding}'
+
+
+def choose_encoding():
+    """Pick the best content encoding the client accepts."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def encoded_json_response(body, compress=True):
+    """
+    Serve an :class:`EncodedBody`, answering ``304 Not Modified`` when the
+    client's ``If-None-Match`` already names it.
+
+    Usage:
+        return encoded_json_response(snapshot.encoded('courses'))
+
+    :param body: The body to send
+    :param compress: Whether a compressed variant may be sent
+    :return: A Flask response
+    """
+    encoding = choose_encoding() if compress else 'identity'
+    response = current_app.response_class(mimetype='application/json')
+    response.set_etag(body.variant_etag(encoding))
+    response.vary.add('Accept-Encoding')
+
+    # Every variant of the same body is equally fresh for revalidation.
+    if any(request.if_none_match.contains_weak(body.variant_etag(name))
+           for name in ('identity', 'gzip', 'br')):
+        response.status_code = 304
+        return response
+
+    response.set_data(body.variant(encoding))
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return response
@@ -1,18 +1,30 @@
+import io
 from flask import Blueprint, request, jsonify
-from backend.models import Course, CourseSection
+from backend.models import Course, CourseSection, CatalogState
+from backend.models.user import UserType
+from backend.auth import auth_required
 from backend.extensions import db
+from backend.catalog import (
+    COURSE_FIELDS, LISTING_FIELDS, SECTION_FIELDS, build_meeting_index, current_catalog,
+    invalidate_catalog, section_records
+)
+from backend.responses import EncodedBody, encoded_json_response
+from backend.catalog_import import CatalogImportError, import_sections_csv
+from backend.catalog_sync import replace_rows
+from backend.serializers import select_rows
+from backend.scheduling import day_windows, free_windows, parse_days, parse_time
 
 bp = Blueprint('catalog', __name__)
 
 @bp.route('/courses', methods=['GET'])
 def get_courses():
     """Get all courses."""
-    courses = Course.query.all()
-    return jsonify([{
-        'department_id': c.department_id,
-        'course_number': c.course_number,
-        'course_title': c.course_title
-    } for c in courses])
+    snapshot = current_catalog()
+    if snapshot is not None:
+        return encoded_json_response(snapshot.encoded('course_rows'))
+
+    courses = select_rows(Course, only=COURSE_FIELDS, order_by=Course.id)
+    return encoded_json_response(EncodedBody(courses), compress=False)
 
 
 @bp.route('/courses', methods=['POST'])
@@ -24,10 +36,7 @@ def save_courses():
         return jsonify({'error': 'Invalid input format - expected a list of courses'}), 400
 
     try:
-        # Delete all existing courses
-        Course.query.delete()
-        
-        # Now add the new courses
+        rows = []
         for course_entry in course_catalog:
             # Normalize the data
             normalized_entry = {
@@ -43,11 +52,20 @@ def save_courses():
                 return jsonify({
                     'error': f"Validation failed for course {normalized_entry['departmentId']} {normalized_entry['courseNumber']}: {str(ve)}"
                 }), 400
-                
-            db.session.add(course)
-        
+
+            rows.append({
+                'department_id': course.department_id,
+                'course_number': course.course_number,
+                'course_title': course.course_title
+            })
+
+        # Write only what differs from the current catalog
+        result = replace_rows(Course.__table__, ('department_id', 'course_number'), rows)
+        if result.changed:
+            CatalogState.bump()
         db.session.commit()
-        return jsonify({'message': 'Courses saved successfully'}), 201
+        invalidate_catalog()
+        return jsonify(dict(result.to_json(), message='Courses saved successfully')), 201
         
     except KeyError as e:
         db.session.rollback()
@@ -59,17 +77,12 @@ def save_courses():
 @bp.route('/courses/sections/all', methods=['GET'])
 def get_all_course_sections():
     """Get all course sections."""
-    sections = CourseSection.query.all()
-    return jsonify([{
-        'department_id': cs.department_id,
-        'course_number': cs.course_number,
-        'course_title': cs.course_title,
-        'section_id': cs.section_id,
-        'instructor': cs.instructor,
-        'days': cs.days,
-        'start_time': cs.start_time,
-        'end_time': cs.end_time
-    } for cs in sections])
+    snapshot = current_catalog()
+    if snapshot is not None:
+        return encoded_json_response(snapshot.encoded('section_rows'))
+
+    sections = select_rows(CourseSection, only=SECTION_FIELDS, order_by=CourseSection.id)
+    return encoded_json_response(EncodedBody(sections), compress=False)
 
 @bp.route('/courses/sections', methods=['GET'])
 def get_course_sections():
@@ -79,43 +92,129 @@ def get_course_sections():
     if not all(k in data for k in ['department_id', 'course_number']):
         return jsonify({'message': 'Missing required fields'}), 400
 
-    sections = CourseSection.query.filter_by(
-        department_id=data['department_id'],
-        course_number=data['course_number']
-    ).all()
-
-    return jsonify([{
-        'department_id': cs.department_id,
-        'course_number': cs.course_number,
-        'section_id': cs.section_id,
-        'instructor': cs.instructor,
-        'days': cs.days,
-        'start_time': cs.start_time,
-        'end_time': cs.end_time
-    } for cs in sections])
+    snapshot = current_catalog()
+    if snapshot is not None:
+        return jsonify(snapshot.course_listing(data['department_id'], data['course_number']))
+
+    sections = select_rows(
+        CourseSection,
+        CourseSection.department_id == data['department_id'],
+        CourseSection.course_number == data['course_number'],
+        only=LISTING_FIELDS,
+        order_by=CourseSection.id
+    )
+    return jsonify(sections)
+
+@bp.route('/courses/sections/fitting', methods=['POST'])
+def get_fitting_course_sections():
+    """
+    Get every section whose meetings fall entirely inside the given free time.
+
+    The body has either ``free`` or ``busy``: a list of
+    ``{days, start_time, end_time}`` windows. With ``busy``, the free time
+    is everything outside those windows, so days without busy windows are
+    free all day.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict) or ('free' in data) == ('busy' in data):
+        return jsonify({'message': 'Provide exactly one of free or busy'}), 400
+    blocks = data.get('free', data.get('busy'))
+    if not isinstance(blocks, list):
+        return jsonify({'message': 'Time windows must be a list'}), 400
+
+    try:
+        parsed = []
+        for block in blocks:
+            start, end = parse_time(block['start_time']), parse_time(block['end_time'])
+            if end <= start:
+                raise ValueError('Window must end after it starts')
+            parsed.append((parse_days(block['days']), start, end))
+    except KeyError as e:
+        return jsonify({'message': f'Missing required field: {str(e)}'}), 400
+    except (TypeError, ValueError) as ve:
+        return jsonify({'message': f'Invalid time window: {str(ve)}'}), 400
+
+    windows = day_windows(parsed)
+    if 'busy' in data:
+        windows = free_windows(windows)
+
+    snapshot = current_catalog()
+    if snapshot is not None:
+        index = snapshot.meeting_index()
+    else:
+        index = build_meeting_index(section_records())
+    return jsonify([record.catalog_row for record in index.fitting(windows)])
 
 @bp.route('/courses/sections', methods=['POST'])
 def save_course_sections():
     """Save course sections to catalog (admin/root functionality)."""
     sectionCatalog = request.get_json()
-    CourseSection.query.delete()
-
-    for sectionEntry in sectionCatalog:
-        sectiondata = CourseSection(
-            department_id=sectionEntry['departmentId'],
-            course_number=sectionEntry['courseNumber'],
-            course_title=sectionEntry['courseTitle'],
-            section_id=sectionEntry['sectionId'],
-            instructor=sectionEntry['instructor'],
-            days=sectionEntry['days'],
-            start_time=sectionEntry['startTime'],
-            end_time=sectionEntry['endTime']
-        )
-        db.session.add(sectiondata)
+
+    if not isinstance(sectionCatalog, list):
+        return jsonify({'error': 'Invalid input format - expected a list of course sections'}), 400
 
     try:
+        rows = []
+        for sectionEntry in sectionCatalog:
+            row = {
+                'department_id': sectionEntry['departmentId'],
+                'course_number': sectionEntry['courseNumber'],
+                'course_title': sectionEntry['courseTitle'],
+                'section_id': sectionEntry['sectionId'],
+                'instructor': sectionEntry['instructor'],
+                'days': sectionEntry['days'],
+                'start_time': sectionEntry['startTime'],
+                'end_time': sectionEntry['endTime']
+            }
+            try:
+                row.update(CourseSection.meeting_columns(row['days'], row['start_time'], row['end_time']))
+            except ValueError as ve:
+                return jsonify({
+                    'error': f"Validation failed for section {row['department_id']} {row['course_number']} {row['section_id']}: {str(ve)}"
+                }), 400
+            rows.append(row)
+
+        # Write only what differs from the current catalog
+        result = replace_rows(
+            CourseSection.__table__, ('department_id', 'course_number', 'section_id'), rows
+        )
+        if result.changed:
+            CatalogState.bump()
         db.session.commit()
-        return jsonify({'message': 'Course sections saved successfully'}), 201
+        invalidate_catalog()
+        return jsonify(dict(result.to_json(), message='Course sections saved successfully')), 201
+    except KeyError as e:
+        db.session.rollback()
+        return jsonify({'error': f'Missing required field: {str(e)}'}), 400
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/courses/sections/import', methods=['POST'])
+@auth_required(UserType.ADMIN, UserType.ROOT)
+def import_course_sections():
+    """
+    Import course sections from a registrar CSV (admin/root functionality).
+
+    The CSV is sent either as the raw request body or as a multipart ``file``
+    field, and is parsed as it is read. Pass ``?mode=append`` to keep the
+    existing sections instead of replacing them. A replace that inserts
+    nothing, or rejects too many rows, is rolled back and answered with 400.
+    """
+    upload = request.files.get('file')
+    raw_stream = upload.stream if upload is not None else request.stream
+    text_stream = io.TextIOWrapper(raw_stream, encoding='utf-8-sig', newline='')
+
+    try:
+        report = import_sections_csv(text_stream, replace=request.args.get('mode') != 'append')
+    except CatalogImportError as e:
+        if e.report is not None:
+            return jsonify(dict(e.report.to_json(), error=str(e))), 400
+        return jsonify({'error': str(e)}), 400
+    except UnicodeDecodeError:
+        return jsonify({'error': 'CSV must be UTF-8 encoded'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    invalidate_catalog()
+    return jsonify(dict(report.to_json(), message='Course sections imported')), 201
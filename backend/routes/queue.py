@@ -1,41 +1,56 @@
 from flask import Blueprint, request, jsonify
 from backend.models.user import User, UserType, RegistrationQueue
 from backend.extensions import db
+from backend.auth import auth_required, invalidate_principals
 
 bp = Blueprint('queue', __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
 @bp.route('', methods=['GET'])
+@auth_required(UserType.ADMIN, UserType.ROOT)
 def get_queue():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Missing or invalid authorization header'}), 401
-    
-    token = auth_header.split(' ')[1]
-    user = User.check_token(token)
-    if not user or user.user_type not in [UserType.ADMIN, UserType.ROOT]:
-        return jsonify({'message': 'Unauthorized access'}), 403
+    """
+    List pending registration requests, oldest first.
+
+    Without query parameters the whole queue is returned. Pass
+    ``?after_id=<id>`` and/or ``?limit=<n>`` (default 100, at most 500) to
+    page instead; when more requests remain the id to continue after is
+    returned in the ``X-Next-After-Id`` header.
+    """
+    paged = 'after_id' in request.args or 'limit' in request.args
+    after_id = request.args.get('after_id', default=0, type=int)
+    limit = min(max(request.args.get('limit', default=DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+    # Join the users in so listing costs one query however long the page is
+    query = db.session.query(
+        RegistrationQueue.id, User.email, RegistrationQueue.request_type, RegistrationQueue.user_id
+    ).join(User, RegistrationQueue.user_id == User.id).filter(
+        RegistrationQueue.approved == False,
+        RegistrationQueue.id > after_id
+    ).order_by(RegistrationQueue.id)
+    if paged:
+        pending_requests = query.limit(limit + 1).all()
+    else:
+        pending_requests = query.all()
+        limit = len(pending_requests)
 
-    pending_requests = RegistrationQueue.query.filter_by(approved=False).all()
     queue_data = [{
         'id': req.id,
-        'user_email': req.user.email,
+        'user_email': req.email,
         'request_type': req.request_type.value,
         'user_id': req.user_id
-    } for req in pending_requests]
+    } for req in pending_requests[:limit]]
     
-    return jsonify(queue_data), 200
+    response = jsonify(queue_data)
+    if len(pending_requests) > limit:
+        response.headers['X-Next-After-Id'] = str(queue_data[-1]['id'])
+    return response, 200
 
 @bp.route('', methods=['POST'])
+@auth_required(UserType.ADMIN, UserType.ROOT)
 def process_queue_request():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Missing or invalid authorization header'}), 401
-    
-    token = auth_header.split(' ')[1]
-    admin_user = User.check_token(token)
-    if not admin_user or admin_user.user_type not in [UserType.ADMIN, UserType.ROOT]:
-        return jsonify({'message': 'Unauthorized access'}), 403
-
     data = request.get_json()
     if not all(k in data for k in ['email', 'approval_status']):
         return jsonify({'message': 'Missing required fields'}), 400
@@ -56,3 +71,110 @@ def process_queue_request():
     else:
         queue_request.reject()
         return jsonify({'message': 'Request rejected successfully'}), 200
+
+MAX_BATCH_SIZE = 1000
+
+@bp.route('/batch', methods=['POST'])
+@auth_required(UserType.ADMIN, UserType.ROOT)
+def process_queue_batch():
+    """
+    Approve or reject many registration requests in one transaction.
+
+    Expects ``{"items": [{"email": ..., "approval_status": bool}, ...]}``; an
+    item may name the queue entry by ``id`` instead of ``email``. Items are
+    resolved with two set-based lookups and applied with one UPDATE/DELETE
+    per kind of change. The response carries one result per item, in order.
+    """
+    data = request.get_json()
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return jsonify({'message': 'Missing required fields'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'message': f'At most {MAX_BATCH_SIZE} items per batch'}), 400
+
+    targets = [_batch_target(item) for item in items]
+    emails = {value for kind, value in filter(None, targets) if kind == 'email'}
+    queue_ids = {value for kind, value in filter(None, targets) if kind == 'id'}
+
+    known_emails = set()
+    if emails:
+        known_emails = {email for email, in db.session.query(User.email).filter(User.email.in_(emails))}
+
+    pending_by_email, pending_by_id = {}, {}
+    if emails or queue_ids:
+        lookups = []
+        if emails:
+            lookups.append(User.email.in_(emails))
+        if queue_ids:
+            lookups.append(RegistrationQueue.id.in_(queue_ids))
+        pending = db.session.query(RegistrationQueue.id, RegistrationQueue.user_id, User.email).join(
+            User, RegistrationQueue.user_id == User.id
+        ).filter(RegistrationQueue.approved == False, db.or_(*lookups)).all()
+        for row in pending:
+            pending_by_email[row.email] = row
+            pending_by_id[row.id] = row
+
+    results = []
+    decided = {}
+    for item, target in zip(items, targets):
+        if target is None:
+            results.append({'status': 400, 'message': 'Missing required fields'})
+            continue
+
+        kind, value = target
+        result = {kind: value}
+        if kind == 'email' and value not in known_emails:
+            result.update(status=404, message='User not found')
+        else:
+            row = pending_by_email.get(value) if kind == 'email' else pending_by_id.get(value)
+            if row is None:
+                result.update(status=404, message='No pending request found for this user')
+            elif row.id in decided:
+                result.update(status=409, message='Request already decided earlier in this batch')
+            else:
+                decided[row.id] = (row, bool(item['approval_status']))
+                if item['approval_status']:
+                    result.update(status=200, message='Request approved successfully')
+                else:
+                    result.update(status=200, message='Request rejected successfully')
+        results.append(result)
+
+    approve_ids = [queue_id for queue_id, (row, approve) in decided.items() if approve]
+    approve_user_ids = [row.user_id for row, approve in decided.values() if approve]
+    reject_ids = [queue_id for queue_id, (row, approve) in decided.items() if not approve]
+
+    try:
+        if approve_ids:
+            RegistrationQueue.query.filter(RegistrationQueue.id.in_(approve_ids)).update(
+                {RegistrationQueue.approved: True}, synchronize_session=False
+            )
+            User.query.filter(User.id.in_(approve_user_ids)).update(
+                {User.verified: True}, synchronize_session=False
+            )
+        if reject_ids:
+            RegistrationQueue.query.filter(RegistrationQueue.id.in_(reject_ids)).delete(
+                synchronize_session=False
+            )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    # Bulk updates skip the ORM events that normally evict cached principals
+    invalidate_principals(approve_user_ids)
+    return jsonify({
+        'results': results,
+        'approved': len(approve_ids),
+        'rejected': len(reject_ids)
+    }), 200
+
+
+def _batch_target(item):
+    """Return ``('email', value)`` or ``('id', value)`` for a batch item, or None if it is malformed."""
+    if not isinstance(item, dict) or 'approval_status' not in item:
+        return None
+    if isinstance(item.get('email'), str) and item['email']:
+        return ('email', item['email'])
+    if isinstance(item.get('id'), int):
+        return ('id', item['id'])
+    return None
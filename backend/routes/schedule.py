@@ -1,108 +1,481 @@
-from itertools import product
-from flask import Blueprint, request, jsonify
-from backend.models import CourseSection
+import hashlib
+from bisect import bisect_right
+from itertools import chain, islice
+from flask import (
+    Blueprint, Response, request, jsonify, json, current_app, stream_with_context
+)
+from itsdangerous import URLSafeSerializer, BadSignature
+from backend.models import CourseSection, CatalogState
 from backend.extensions import db
+from backend.catalog import LISTING_FIELDS, course_key, current_catalog, load_course_sections
+from backend.responses import EncodedBody, encoded_json_response
+from backend.serializers import select_rows
+from backend.metrics import record_schedule_search
+from backend.schedule_cache import CanonicalRequest, ResultBuffer, schedule_cache
+from backend.scheduling import (
+    SearchStats, iter_schedules, iter_schedules_parallel, search_space, check_feasibility,
+    supported_options, compile_meeting, compile_section, Preferences, top_schedules
+)
 
 bp = Blueprint('schedule', __name__)
 
+MAX_PAGE_SIZE = 500
+DEFAULT_PARALLEL_THRESHOLD = 1000000
+DEFAULT_COUNT_CAP = 10000
+MAX_COUNT_CAP = 1000000
+
 @bp.route('', methods=['GET'])
 def get_schedule():
     """Get all course sections."""
-    sections = CourseSection.query.all()
-    return jsonify([{
-        'department_id': s.department_id,
-        'course_number': s.course_number,
-        'section_id': s.section_id,
-        'instructor': s.instructor,
-        'days': s.days,
-        'start_time': s.start_time,
-        'end_time': s.end_time
-    } for s in sections])
+    snapshot = current_catalog()
+    if snapshot is not None:
+        return encoded_json_response(snapshot.encoded('listing_rows'))
+
+    sections = select_rows(CourseSection, only=LISTING_FIELDS, order_by=CourseSection.id)
+    return encoded_json_response(EncodedBody(sections), compress=False)
 
 @bp.route('/generate', methods=['POST'])
 def generate_schedules():
-    """Generate possible schedules based on selected courses and reserved times."""
+    """
+    Generate possible schedules based on selected courses and reserved times.
+
+    By default every valid schedule is returned as one JSON list. Two optional
+    modes avoid holding all of them in memory:
+
+    - ``"stream": true`` (or ``Accept: application/x-ndjson``) streams one
+      schedule per line as the search finds them.
+    - ``"limit": n`` returns ``{"schedules": [...], "next_cursor": token}``;
+      sending the token back as ``"cursor"`` resumes the search where the
+      previous page stopped.
+
+    Sending ``"preferences"`` (see :class:`Preferences`) instead returns only
+    the ``top_k`` best schedules, best first, each with its ``score``; they
+    are sent as NDJSON when streaming is asked for, and cannot be paged.
+
+    ``"locked"`` takes ``{department_id, course_number, section_id}`` entries
+    for sections the student has already chosen. Their courses are limited
+    to those sections, and every other section that clashes with them is
+    dropped before the search. The response then becomes
+    ``{"schedules": [...], "compatible": [...]}``. ``compatible`` lists, for
+    each course that is not locked, the sections that still appear in at
+    least one schedule. Paged responses gain the same ``compatible`` key.
+    Locked requests cannot be streamed.
+
+    Complete results are cached per catalog version (see
+    :func:`backend.schedule_cache.schedule_cache`), so repeats of a request,
+    with the courses in any order, skip the search.
+    """
     data = request.get_json()
     if not all(k in data for k in ['courses', 'reserved']):
         return jsonify({'message': 'Missing required fields'}), 400
 
-    # Get all sections for requested courses
+    compiled, error = _compile_request(data)
+    if error is not None:
+        return error
+    version, section_options, reserved = compiled
+
+    compatible = None
+    if data.get('locked'):
+        if _wants_stream(data):
+            return jsonify({'message': 'locked cannot be combined with stream'}), 400
+        locked_groups, error = _apply_locks(data, section_options)
+        if error is not None:
+            return error
+        if reserved:
+            reserved = section_options[-1]
+        compatible = _compatible_sections(data, section_options, locked_groups)
+
+    if data.get('preferences') is not None:
+        return _ranked_schedules(data, section_options, compatible)
+
+    mask_groups = [[option.mask for option in options] for options in section_options]
+
+    # Identical requests, in any course order, reuse an earlier search's result
+    results = schedule_cache()
+    request_key = cached = None
+    if results is not None:
+        request_key = CanonicalRequest(
+            version,
+            [(course['department_id'], course['course_number']) for course in data['courses']],
+            reserved,
+            locked=[
+                (lock['department_id'], lock['course_number'], lock['section_id'])
+                for lock in data.get('locked') or ()
+            ]
+        )
+        cached = results.get(request_key)
+
+    if data.get('limit') is not None:
+        return _schedule_page(data, section_options, mask_groups, version, cached, compatible)
+
+    if cached is not None:
+        if not cached:
+            return jsonify({
+                'message': 'No valid schedules found - all possible combinations have time conflicts'
+            }), 404
+        if _wants_stream(data):
+            def generate_cached():
+                for path in cached:
+                    yield json.dumps(serialize_schedule(section_options, path)) + '\n'
+
+            return Response(stream_with_context(generate_cached()), mimetype='application/x-ndjson')
+        return _schedule_list([serialize_schedule(section_options, path) for path in cached], compatible)
+
+    # Search for conflict-free schedules, pruning as soon as a course clashes
+    stats = SearchStats()
+    paths = _search(section_options, mask_groups, stats)
+    first = next(paths, None)
+    if first is None:
+        record_schedule_search('list', stats.nodes, 0)
+        if results is not None:
+            results.put(request_key, [])
+        return jsonify({
+            'message': 'No valid schedules found - all possible combinations have time conflicts'
+        }), 404
+
+    if _wants_stream(data):
+        def generate():
+            # Pack the paths for the cache as they go out, rather than keep them as tuples
+            buffer = ResultBuffer(results, request_key) if results is not None else None
+            sent = 0
+            complete = False
+            try:
+                for path in chain((first,), paths):
+                    if buffer is not None:
+                        buffer.add(path)
+                    yield json.dumps(serialize_schedule(section_options, path)) + '\n'
+                    sent += 1
+                complete = True
+            finally:
+                paths.close()
+                record_schedule_search('stream', stats.nodes, sent)
+                if complete and buffer is not None:
+                    buffer.store()
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    found = [first]
+    found.extend(paths)
+    record_schedule_search('list', stats.nodes, len(found))
+    if results is not None:
+        results.put(request_key, found)
+    return _schedule_list([serialize_schedule(section_options, path) for path in found], compatible)
+
+
+def _wants_stream(data):
+    """Whether the client asked for NDJSON, by ``"stream": true`` or its Accept header."""
+    return bool(data.get('stream')) or request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def _schedule_list(schedules, compatible):
+    """Return the schedules as a bare list, or in an envelope with ``compatible`` for locked requests."""
+    if compatible is None:
+        return jsonify(schedules)
+    return jsonify({'schedules': schedules, 'compatible': compatible})
+
+
+@bp.route('/generate/count', methods=['POST'])
+def count_schedules():
+    """
+    Report whether a generate request has any schedule, and how many, without building them.
+
+    Takes the same ``courses`` and ``reserved`` as ``/generate`` plus an
+    optional ``cap`` (default 10000) at which counting stops. Returns
+    ``feasible``, ``count`` (a lower bound when ``capped`` is true) and
+    ``conflicts``: the pairs of courses, or a course and the reserved times,
+    that cannot be taken together in any section combination.
+    """
+    data = request.get_json()
+    if not all(k in data for k in ['courses', 'reserved']):
+        return jsonify({'message': 'Missing required fields'}), 400
+    try:
+        cap = int(data.get('cap', DEFAULT_COUNT_CAP))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'cap must be an integer'}), 400
+    if not 1 <= cap <= MAX_COUNT_CAP:
+        return jsonify({'message': f'cap must be between 1 and {MAX_COUNT_CAP}'}), 400
+
+    compiled, error = _compile_request(data)
+    if error is not None:
+        return error
+    _, section_options, _ = compiled
+
+    stats = SearchStats()
+    result = check_feasibility(
+        [[option.mask for option in options] for options in section_options], cap=cap, stats=stats
+    )
+    record_schedule_search('count', stats.nodes, result.count)
+
+    def label(index):
+        if index < len(data['courses']):
+            course = data['courses'][index]
+            return {'department_id': course['department_id'], 'course_number': course['course_number']}
+        return {'reserved': True}
+
+    return jsonify({
+        'feasible': result.feasible,
+        'count': result.count,
+        'capped': result.capped,
+        'conflicts': [[label(i), label(j)] for i, j in result.conflicting_pairs]
+    })
+
+
+def _compile_request(data):
+    """
+    Load the sections a generate request names and compile them, plus its reserved blocks.
+
+    :return: ``((catalog_version, section_options, reserved), None)``, or
+        ``(None, error_response)`` if a course or meeting time is invalid
+    """
+    # Get all sections for requested courses, compiled to weekly time masks
+    snapshot = current_catalog()
+    if snapshot is not None:
+        version = snapshot.version
+    else:
+        # Read the version first so results are never filed under a newer catalog
+        version = CatalogState.current_version()
+        # One query for every requested course rather than one per course
+        grouped = load_course_sections(
+            (course['department_id'], course['course_number']) for course in data['courses']
+        )
     section_options = []
     for course in data['courses']:
-        sections = CourseSection.query.filter_by(
-            department_id=course['department_id'],
-            course_number=course['course_number']
-        ).all()
-        
+        try:
+            if snapshot is not None:
+                compiled = snapshot.compiled_sections(course['department_id'], course['course_number'])
+            else:
+                records = grouped.get(course_key(course['department_id'], course['course_number']), ())
+                compiled = [compile_section(record) for record in records]
+        except ValueError as ve:
+            return None, (jsonify({
+                'message': f'Invalid meeting time for {course["department_id"]} {course["course_number"]}: {str(ve)}'
+            }), 400)
+
         # Add error handling for when no sections are found
-        if not sections:
-            return jsonify({
+        if not compiled:
+            return None, (jsonify({
                 'message': f'No sections found for {course["department_id"]} {course["course_number"]}'
-            }), 404
-            
-        section_options.append(sections)
+            }), 404)
+
+        section_options.append(compiled)
 
-    # Add reserved times as sections if list exists and is not empty
+    # Add reserved times as an extra option group if list exists and is not empty
+    reserved = []
     if 'reserved' in data and data['reserved'] and isinstance(data['reserved'], list):
-        reserved_sections = []
-        for r in data['reserved']:
-            reserved = CourseSection(
-                department_id='RESV',
-                course_number='0000',
-                section_id='0',
-                instructor='Reserved',
-                days=''.join(r['days']),
-                start_time=r['start_time'],
-                end_time=r['end_time']
-            )
-            reserved_sections.append(reserved)
-        section_options.append(reserved_sections)
-
-    # Add logging for debugging
-    possible_schedules = list(product(*section_options))
-    if not possible_schedules:
+        try:
+            reserved = [
+                compile_meeting(r['days'], r['start_time'], r['end_time'])
+                for r in data['reserved']
+            ]
+        except ValueError as ve:
+            return None, (jsonify({'message': f'Invalid reserved time: {str(ve)}'}), 400)
+        section_options.append(reserved)
+
+    return (version, section_options, reserved), None
+
+
+def _apply_locks(data, section_options):
+    """
+    Limit locked courses to their locked sections and drop sections that clash with them.
+
+    ``section_options`` is updated in place. A course locked to one section
+    rules out every overlapping section of the other courses and of the
+    reserved times. A course locked to several sections keeps all of them.
+
+    :return: ``(locked_group_indices, None)``, or ``(None, error_response)``
+    """
+    if not isinstance(data['locked'], list):
+        return None, (jsonify({'message': 'locked must be a list'}), 400)
+
+    positions = {}
+    for index, course in enumerate(data['courses']):
+        positions.setdefault(course_key(course['department_id'], course['course_number']), index)
+
+    wanted = {}
+    for lock in data['locked']:
+        try:
+            key = course_key(lock['department_id'], lock['course_number'])
+            section_id = str(lock['section_id']).strip()
+        except (KeyError, TypeError):
+            return None, (jsonify({
+                'message': 'Each locked section needs department_id, course_number and section_id'
+            }), 400)
+        if key not in positions:
+            return None, (jsonify({
+                'message': f'Locked section {key[0]} {key[1]} {section_id} is not one of the requested courses'
+            }), 400)
+        wanted.setdefault(positions[key], set()).add(section_id)
+
+    fixed = 0
+    for group, section_ids in wanted.items():
+        options = [
+            option for option in section_options[group]
+            if str(option.section.section_id).strip() in section_ids
+        ]
+        missing = section_ids - {str(option.section.section_id).strip() for option in options}
+        if missing:
+            course = data['courses'][group]
+            return None, (jsonify({
+                'message': f'No section {sorted(missing)[0]} found for {course["department_id"]} {course["course_number"]}'
+            }), 404)
+        section_options[group] = options
+        if len(options) == 1:
+            if options[0].mask & fixed:
+                return None, (jsonify({'message': 'No valid schedules found - locked sections conflict with each other'}), 404)
+            fixed |= options[0].mask
+
+    if fixed:
+        for group, options in enumerate(section_options):
+            if group not in wanted:
+                section_options[group] = [option for option in options if not option.mask & fixed]
+                # Answer here rather than search or cache with an emptied group: a
+                # reserved group pruned to nothing would share its cache key with
+                # the same request sent without reserved times
+                if not section_options[group]:
+                    return None, (jsonify({
+                        'message': 'No valid schedules found - all possible combinations have time conflicts'
+                    }), 404)
+    return set(wanted), None
+
+
+def _compatible_sections(data, section_options, locked_groups):
+    """List, for each course that is not locked, the sections used by at least one valid schedule."""
+    supported = supported_options([[option.mask for option in options] for options in section_options])
+    compatible = []
+    for group, course in enumerate(data['courses']):
+        if group in locked_groups:
+            continue
+        compatible.append({
+            'department_id': course['department_id'],
+            'course_number': course['course_number'],
+            'section_ids': [
+                option.section.section_id
+                for index, option in enumerate(section_options[group])
+                if index in supported[group]
+            ]
+        })
+    return compatible
+
+
+def _ranked_schedules(data, section_options, compatible=None):
+    """Return the best few schedules for the request's preferences, as JSON or NDJSON."""
+    if data.get('limit') is not None:
+        return jsonify({'message': 'preferences cannot be combined with limit'}), 400
+    try:
+        preferences = Preferences.from_json(data['preferences'])
+    except ValueError as ve:
+        return jsonify({'message': f'Invalid preferences: {str(ve)}'}), 400
+
+    stats = SearchStats()
+    ranked = top_schedules(section_options, preferences, stats=stats)
+    record_schedule_search('ranked', stats.nodes, len(ranked))
+    if not ranked:
         return jsonify({
-            'message': 'No possible schedule combinations could be generated'
+            'message': 'No valid schedules found - all possible combinations have time conflicts'
         }), 404
 
-    def check_overlap(schedule):
-        for i in range(len(schedule)):
-            for j in range(i + 1, len(schedule)):
-                # Check for common days
-                common_days = set(schedule[i].days) & set(schedule[j].days)
-                if not common_days:
-                    continue
-                    
-                # Convert times to integers for comparison
-                s1_start = int(schedule[i].start_time)
-                s1_end = int(schedule[i].end_time)
-                s2_start = int(schedule[j].start_time)
-                s2_end = int(schedule[j].end_time)
-                
-                # Check for time overlap
-                if s1_start < s2_end and s1_end > s2_start:
-                    return True
-        return False
-
-    # Filter out schedules with conflicts
-    valid_schedules = [schedule for schedule in possible_schedules if not check_overlap(schedule)]
-    if not valid_schedules:
+    schedules = [dict(serialize_schedule(section_options, path), score=score) for score, path in ranked]
+    if _wants_stream(data):
+        return Response(
+            ''.join(json.dumps(schedule) + '\n' for schedule in schedules), mimetype='application/x-ndjson'
+        )
+    return _schedule_list(schedules, compatible)
+
+
+def _schedule_page(data, section_options, mask_groups, catalog_version, cached=None, compatible=None):
+    """
+    Return one page of schedules plus a cursor to resume the search.
+
+    :param cached: Every schedule for this request, in search order, when
+        the result cache has them; the page is then sliced from that list
+    :param compatible: Compatible sections to include for a locked request
+    """
+    try:
+        limit = int(data['limit'])
+    except (TypeError, ValueError):
+        return jsonify({'message': 'limit must be an integer'}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    fingerprint = _request_fingerprint(data, catalog_version)
+    after = None
+    if data.get('cursor'):
+        try:
+            cursor = _cursor_serializer().loads(data['cursor'])
+        except BadSignature:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        if cursor.get('request') != fingerprint:
+            return jsonify({'message': 'Cursor does not match this request'}), 400
+        after = tuple(cursor['path'])
+
+    if cached is not None:
+        start = bisect_right(cached, after) if after is not None else 0
+        paths = cached[start:start + limit + 1]
+    else:
+        try:
+            # Fetch one extra schedule to learn whether another page exists
+            stats = SearchStats()
+            search = iter_schedules(mask_groups, after=after, stats=stats)
+            paths = list(islice(search, limit + 1))
+            search.close()
+        except ValueError:
+            return jsonify({'message': 'Cursor does not match this request'}), 400
+        record_schedule_search('page', stats.nodes, min(len(paths), limit))
+
+    if not paths and after is None:
         return jsonify({
             'message': 'No valid schedules found - all possible combinations have time conflicts'
         }), 404
 
-    # Convert to JSON response format, excluding reserved times
-    response = [{
-        'sections': [{
-            'department_id': section.department_id,
-            'course_number': section.course_number,
-            'section_id': section.section_id,
-            'instructor': section.instructor,
-            'days': list(section.days),
-            'start_time': section.start_time,
-            'end_time': section.end_time
-        } for section in schedule if section.department_id != 'RESV']
-    } for schedule in valid_schedules]
+    next_cursor = None
+    if len(paths) > limit:
+        paths = paths[:limit]
+        next_cursor = _cursor_serializer().dumps({'request': fingerprint, 'path': list(paths[-1])})
 
+    response = {
+        'schedules': [serialize_schedule(section_options, path) for path in paths],
+        'next_cursor': next_cursor
+    }
+    if compatible is not None:
+        response['compatible'] = compatible
     return jsonify(response)
 
+
+def serialize_schedule(section_options, path):
+    """Build the JSON form of one schedule, excluding reserved times."""
+    return {
+        'sections': [
+            option.section.schedule_row
+            for option in (options[index] for options, index in zip(section_options, path))
+            if option.section is not None
+        ]
+    }
+
+
+def _search(section_options, mask_groups, stats):
+    """
+    Start the full search, on a process pool when the search space is large.
+
+    Parallel search is used when ``SCHEDULE_PARALLEL_WORKERS`` is above 1 and
+    the unpruned number of combinations reaches ``SCHEDULE_PARALLEL_THRESHOLD``;
+    smaller requests stay in-process and pay no IPC cost. Both paths yield
+    the same schedules in the same order.
+    """
+    config = current_app.config
+    workers = config.get('SCHEDULE_PARALLEL_WORKERS', 0)
+    threshold = config.get('SCHEDULE_PARALLEL_THRESHOLD', DEFAULT_PARALLEL_THRESHOLD)
+    if workers > 1 and search_space(mask_groups) >= threshold:
+        return iter_schedules_parallel(section_options, workers, stats=stats)
+    return iter_schedules(mask_groups, stats=stats)
+
+
+def _cursor_serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='schedule-cursor')
+
+
+def _request_fingerprint(data, catalog_version):
+    """Hash the parts of a generate request that determine its search space."""
+    key = json.dumps(
+        [catalog_version, data['courses'], data['reserved'], data.get('locked')], sort_keys=True
+    )
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
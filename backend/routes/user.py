@@ -1,8 +1,8 @@
-from flask import Blueprint, request, jsonify, current_app, redirect
+from flask import Blueprint, request, jsonify, redirect
 from backend.models.user import User, UserType, RegistrationQueue, RequestType
-from backend.extensions import db, mail, bcrypt
+from backend.extensions import db, bcrypt
+from backend.mailer import notify_outbox, queue_verification_email
 from itsdangerous import URLSafeTimedSerializer
-from flask_mail import Message
 
 bp = Blueprint('user', __name__)
 
@@ -11,6 +11,10 @@ def login():
     data = request.get_json()
     user = User.query.filter_by(email=data['email']).first()
     if user and user.check_password(data['password']) and user.is_verified():
+        if user.password_needs_rehash():
+            # Upgrade hashes made under an older BCRYPT_LOG_ROUNDS while we have the password
+            user.set_password(data['password'])
+            db.session.commit()
         token, expires_on = user.generate_token()
         return jsonify({'token': token, 'expires_on': str(expires_on), 'role': user.get_role().value}), 200
     return jsonify({'message': 'Invalid credentials'}), 401
@@ -30,22 +34,21 @@ def register():
         user_type=UserType(data['user_type'].upper())
     )
     db.session.add(user)
-    db.session.commit()
 
     if user.user_type in [UserType.ADMIN, UserType.ROOT]:
+        db.session.commit()
         request_type = RequestType[user.user_type.name]
         queue = RegistrationQueue(user=user, request_type=request_type)
         db.session.add(queue)
         db.session.commit()
         return jsonify({'message': 'User added to verification queue'}), 201
     else:
+        # The email is queued in the same transaction as the user and sent in the background
         verification_token = user.generate_verification_token()
-        try:
-            send_verification_email(user.email, verification_token)
-            return jsonify({'message': 'Verification email sent'}), 201
-        except Exception as e:
-            current_app.logger.error(f"Failed to send verification email: {str(e)}")
-            return jsonify({'message': 'User registered but failed to send verification email'}), 500
+        queue_verification_email(user.email, verification_token)
+        db.session.commit()
+        notify_outbox()
+        return jsonify({'message': 'Verification email queued'}), 201
 
 @bp.route('/verify/<token>', methods=['GET'])
 def verify(token):
@@ -56,20 +59,3 @@ def verify(token):
         return redirect('https://innovaid.dev')
     return jsonify({'message': 'Invalid or expired token'}), 400
 
-
-def send_verification_email(email, token):
-    """
-    Send a verification email to the user.
-    
-    :param email: The recipient's email address
-    :param token: The verification token
-    """
-    verification_url = f'http://innovaid.dev/api/user/verify/{token}'
-    msg = Message(
-        'Please click the below link to verify your email.',
-        sender=current_app.config['MAIL_USERNAME'],
-        recipients=[email]
-    )
-    msg.body = f'Click the link to verify your email: {verification_url}'
-    mail.send(msg)
-    print(f"Verification email sent to {email}")
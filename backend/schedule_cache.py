@@ -0,0 +1,310 @@
+"""Cache of schedule-generation results keyed by catalog version and normalized request."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from flask import current_app
+from backend.catalog import course_key
+from backend.metrics import record_schedule_cache
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+DISK_FILENAME = 'schedule_cache.sqlite3'
+
+
+class CanonicalRequest(object):
+    """
+    The order-independent form of a generate request.
+
+    Requests naming the same courses and reserved blocks in any order share
+    one cache entry. Paths are stored in canonical order (courses sorted,
+    reserved blocks sorted, reserved group last) and mapped back to the
+    request's order on the way out, then re-sorted so they come out exactly
+    as the search would have produced them.
+    """
+
+    def __init__(self, version, courses, reserved, locked=()):
+        """
+        Create instance.
+
+        :param version: The catalog version the sections were read from
+        :param courses: ``(department_id, course_number)`` pairs in request order
+        :param reserved: Compiled reserved blocks in request order, possibly empty
+        :param locked: ``(department_id, course_number, section_id)`` of locked sections
+        """
+        keys = [course_key(*course) for course in courses]
+        blocks = [(block.day_bits, block.start, block.end) for block in reserved]
+        self.group_order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.reserved_order = sorted(range(len(blocks)), key=blocks.__getitem__)
+        self.reserved_rank = [0] * len(blocks)
+        for rank, index in enumerate(self.reserved_order):
+            self.reserved_rank[index] = rank
+        if blocks:
+            self.group_order.append(len(keys))
+        self.width = len(self.group_order)
+        self.version = version
+        self.key = hashlib.sha1(json.dumps([
+            version,
+            sorted(keys),
+            sorted(blocks),
+            sorted(set(course_key(department_id, course_number) + (str(section_id).strip(),)
+                       for department_id, course_number, section_id in locked))
+        ]).encode('utf-8')).hexdigest()
+
+    def pack(self, flat, path):
+        """Append one request-order path to the ``array('H')`` ``flat`` in canonical order."""
+        canonical = [path[group] for group in self.group_order]
+        if self.reserved_rank:
+            canonical[-1] = self.reserved_rank[canonical[-1]]
+        flat.extend(canonical)
+
+    def encode(self, paths):
+        """Pack request-order paths into canonical order as bytes."""
+        flat = array('H')
+        for path in paths:
+            self.pack(flat, path)
+        return flat.tobytes()
+
+    def decode(self, data):
+        """Unpack stored paths into request order, sorted as the search yields them."""
+        flat = array('H')
+        flat.frombytes(data)
+        width = self.width
+        reserved = bool(self.reserved_order)
+        paths = []
+        path = [0] * width
+        for start in range(0, len(flat), width):
+            for position, group in enumerate(self.group_order):
+                path[group] = flat[start + position]
+            if reserved:
+                path[-1] = self.reserved_order[path[-1]]
+            paths.append(tuple(path))
+        paths.sort()
+        return paths
+
+
+class MemoryTier(object):
+    """A thread-safe LRU of encoded results bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes):
+        """Create instance."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        # Results from an older catalog can never be asked for again; a caller
+        # still on an older version than ours is simply not served
+        if self.version is None or version > self.version:
+            self._entries.clear()
+            self.size = 0
+            self.version = version
+        return version == self.version
+
+    def get(self, version, key):
+        """Return the stored bytes for ``key``, or None."""
+        with self._lock:
+            if not self._check_version(version):
+                return None
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, version, key, data):
+        """Store ``data``, evicting the least recently used entries past the budget."""
+        with self._lock:
+            if not self._check_version(version):
+                return
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DiskTier(object):
+    """
+    A SQLite file shared by every worker on the host.
+
+    Each process and thread opens its own connection. Any SQLite error is
+    logged and treated as a miss, so a locked or damaged file only costs
+    the speed-up.
+    """
+
+    def __init__(self, path, max_bytes):
+        """Create instance."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _connect(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, version INTEGER NOT NULL, data BLOB NOT NULL, used REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_results_used ON results (used)')
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def get(self, version, key):
+        """Return the stored bytes for ``key``, or None."""
+        try:
+            conn = self._connect()
+            row = conn.execute('SELECT version, data FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] != version:
+                conn.execute('DELETE FROM results WHERE version < ?', (version,))
+                return None
+            conn.execute('UPDATE results SET used = ? WHERE key = ?', (time.time(), key))
+            return row[1]
+        except sqlite3.Error as e:
+            current_app.logger.warning(f"Schedule cache read failed: {str(e)}")
+            return None
+
+    def put(self, version, key, data):
+        """Store ``data``, dropping older catalog versions and the oldest entries past the budget."""
+        try:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM results WHERE version < ?', (version,))
+                conn.execute(
+                    'INSERT OR REPLACE INTO results (key, version, data, used) VALUES (?, ?, ?, ?)',
+                    (key, version, data, time.time())
+                )
+                total = conn.execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM results').fetchone()[0]
+                while total > self.max_bytes:
+                    row = conn.execute(
+                        'SELECT key, LENGTH(data) FROM results ORDER BY used LIMIT 1'
+                    ).fetchone()
+                    if row is None:
+                        break
+                    conn.execute('DELETE FROM results WHERE key = ?', (row[0],))
+                    total -= row[1]
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            current_app.logger.warning(f"Schedule cache write failed: {str(e)}")
+
+
+class ScheduleCache(object):
+    """Memory tier in front of an optional disk tier."""
+
+    def __init__(self, memory, disk=None):
+        """Create instance."""
+        self.memory = memory
+        self.disk = disk
+
+    def max_paths(self, request_key):
+        """The most paths an entry may hold and still fit comfortably in the memory budget."""
+        return self.memory.max_bytes // 4 // (2 * max(request_key.width, 1))
+
+    def get(self, request_key):
+        """Return the cached paths for a request in request order, or None on a miss."""
+        data = self.memory.get(request_key.version, request_key.key)
+        tier = 'memory'
+        if data is None and self.disk is not None:
+            data = self.disk.get(request_key.version, request_key.key)
+            tier = 'disk'
+            if data is not None:
+                self.memory.put(request_key.version, request_key.key, data)
+        record_schedule_cache(tier if data is not None else 'miss')
+        if data is None:
+            return None
+        return request_key.decode(data)
+
+    def put(self, request_key, paths):
+        """Store the complete result of a search; results too large for the budget are skipped."""
+        if len(paths) > self.max_paths(request_key):
+            return
+        try:
+            data = request_key.encode(paths)
+        except OverflowError:
+            # Paths are packed as unsigned shorts; a course with 65536+ sections is not cached
+            return
+        self.put_packed(request_key, data)
+
+    def put_packed(self, request_key, data):
+        """Store paths already packed with :meth:`CanonicalRequest.pack`."""
+        self.memory.put(request_key.version, request_key.key, data)
+        if self.disk is not None:
+            self.disk.put(request_key.version, request_key.key, data)
+
+
+class ResultBuffer(object):
+    """
+    Collects the paths of a streamed search, packed, so they can be cached once it completes.
+
+    Paths are packed as they arrive, at two bytes per course, rather than
+    kept as tuples; past :meth:`ScheduleCache.max_paths` the buffer is
+    dropped, so a stream never holds more than the cache could store.
+    """
+
+    def __init__(self, cache, request_key):
+        """Create instance."""
+        self.cache = cache
+        self.request_key = request_key
+        self.limit = cache.max_paths(request_key)
+        self.count = 0
+        self.flat = array('H')
+
+    def add(self, path):
+        """Pack one more path, or give up on caching if the result grows too large."""
+        if self.flat is None:
+            return
+        self.count += 1
+        if self.count > self.limit:
+            self.flat = None
+            return
+        try:
+            self.request_key.pack(self.flat, path)
+        except OverflowError:
+            self.flat = None
+
+    def store(self):
+        """Cache the collected result, unless it was dropped."""
+        if self.flat is not None:
+            self.cache.put_packed(self.request_key, self.flat.tobytes())
+
+
+def schedule_cache():
+    """
+    Return the current app's schedule cache, or None when ``SCHEDULE_CACHE`` is False.
+
+    ``SCHEDULE_CACHE_BYTES`` (64 MiB) bounds the per-worker memory tier.
+    With ``SCHEDULE_CACHE_DISK = True`` results are also written to a SQLite
+    file in the instance folder, bounded by ``SCHEDULE_CACHE_DISK_BYTES``
+    (512 MiB), so every worker on the host can reuse them. Both tiers drop
+    their entries once a newer catalog version is seen.
+    """
+    config = current_app.config
+    if not config.get('SCHEDULE_CACHE', True):
+        return None
+    cache = current_app.extensions.get('schedule_cache')
+    if cache is None:
+        disk = None
+        if config.get('SCHEDULE_CACHE_DISK', False):
+            disk = DiskTier(
+                os.path.join(current_app.instance_path, DISK_FILENAME),
+                config.get('SCHEDULE_CACHE_DISK_BYTES', DEFAULT_DISK_BYTES)
+            )
+        cache = current_app.extensions.setdefault('schedule_cache', ScheduleCache(
+            MemoryTier(config.get('SCHEDULE_CACHE_BYTES', DEFAULT_MEMORY_BYTES)), disk
+        ))
+    return cache
@@ -0,0 +1,16 @@
+"""Schedule search engine used by the schedule routes."""
+from backend.scheduling.feasibility import Feasibility, check_feasibility, supported_options
+from backend.scheduling.intervals import MeetingIndex, day_windows, free_windows
+from backend.scheduling.parallel import iter_schedules_parallel, search_space
+from backend.scheduling.ranking import Preferences, top_schedules
+from backend.scheduling.solver import SearchStats, iter_schedules
+from backend.scheduling.timegrid import (
+    CompiledSection, compile_meeting, compile_section, parse_days, parse_time
+)
+
+__all__ = [
+    'SearchStats', 'iter_schedules', 'iter_schedules_parallel', 'search_space',
+    'Feasibility', 'check_feasibility', 'supported_options',
+    'MeetingIndex', 'day_windows', 'free_windows', 'Preferences', 'top_schedules',
+    'CompiledSection', 'compile_meeting', 'compile_section', 'parse_days', 'parse_time'
+]
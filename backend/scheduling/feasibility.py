@@ -0,0 +1,170 @@
+"""Feasibility checks and schedule counting that never build schedules."""
+from collections import deque, namedtuple
+
+Feasibility = namedtuple('Feasibility', ['feasible', 'count', 'capped', 'conflicting_pairs'])
+Feasibility.__doc__ = """
+Outcome of :func:`check_feasibility`.
+
+``count`` is exact unless ``capped`` is set, in which case at least that many
+schedules exist. ``conflicting_pairs`` lists index pairs of groups that
+cannot be taken together at all.
+"""
+
+
+def conflicting_pairs(groups):
+    """
+    Return the ``(i, j)`` group pairs, ``i < j``, with no two options that fit together.
+
+    :param groups: A sequence of mask lists, one per course
+    """
+    pairs = []
+    for i in range(len(groups)):
+        for j in range(i + 1, len(groups)):
+            if not any(not a & b for a in groups[i] for b in groups[j]):
+                pairs.append((i, j))
+    return pairs
+
+
+def arc_consistency(groups):
+    """
+    Prune options that cannot fit with any option of some other group (AC-3).
+
+    An option survives only if every other group still has an option it
+    does not overlap. Removing options can strip support from others, so
+    affected arcs are re-queued until nothing changes. Every option of a
+    valid schedule survives; a group left empty proves there is none.
+
+    :param groups: A sequence of mask lists, one per course
+    :return: One list of surviving option indices per group
+    """
+    domains = [list(range(len(masks))) for masks in groups]
+    count = len(groups)
+    queue = deque((i, j) for i in range(count) for j in range(count) if i != j)
+    queued = set(queue)
+    while queue:
+        arc = queue.popleft()
+        queued.discard(arc)
+        i, j = arc
+        other = [groups[j][b] for b in domains[j]]
+        kept = [a for a in domains[i] if any(not groups[i][a] & mask for mask in other)]
+        if len(kept) == len(domains[i]):
+            continue
+        domains[i] = kept
+        if not kept:
+            break
+        for k in range(count):
+            if k != i and k != j and (k, i) not in queued:
+                queue.append((k, i))
+                queued.add((k, i))
+    return domains
+
+
+def count_schedules(groups, cap=None, stats=None):
+    """
+    Count the conflict-free combinations of ``groups`` without materialising them.
+
+    The count does not depend on group order, so the smallest groups are
+    placed first, and the last group is counted with one AND per option
+    instead of being descended into.
+
+    :param groups: A sequence of mask lists, one per course
+    :param cap: Stop once this many schedules are found, or None for an exact count
+    :param stats: Optional :class:`SearchStats` whose ``nodes`` counts the sections placed
+    :return: ``(count, capped)``
+    """
+    if not groups:
+        return 1, False
+    ordered = sorted(groups, key=len)
+    last = len(ordered) - 1
+    placed = 0
+    total = 0
+
+    def descend(depth, busy):
+        nonlocal placed, total
+        masks = ordered[depth]
+        if depth == last:
+            total += sum(1 for mask in masks if not mask & busy)
+            return cap is not None and total >= cap
+        for mask in masks:
+            if mask & busy:
+                continue
+            placed += 1
+            if descend(depth + 1, busy | mask):
+                return True
+        return False
+
+    capped = descend(0, 0)
+    if stats is not None:
+        stats.nodes += placed
+    if capped:
+        total = cap
+    return total, capped
+
+
+def check_feasibility(groups, cap=None, stats=None):
+    """
+    Decide whether any schedule exists and count them, up to ``cap``.
+
+    Arc consistency runs first; if it empties a group the answer is known
+    without searching. Otherwise the count runs over the pruned options only.
+
+    :return: A :class:`Feasibility`
+    """
+    pairs = conflicting_pairs(groups)
+    if pairs:
+        return Feasibility(False, 0, False, pairs)
+    domains = arc_consistency(groups)
+    if any(not domain for domain in domains):
+        return Feasibility(False, 0, False, pairs)
+    pruned = [[masks[index] for index in domain] for masks, domain in zip(groups, domains)]
+    count, capped = count_schedules(pruned, cap=cap, stats=stats)
+    return Feasibility(count > 0, count, capped, pairs)
+
+
+def _first_schedule(groups):
+    """Return the option indices of one conflict-free schedule through ``(index, mask)`` groups, or None."""
+    order = sorted(range(len(groups)), key=lambda index: len(groups[index]))
+    path = [0] * len(groups)
+
+    def descend(depth, busy):
+        if depth == len(order):
+            return True
+        group = order[depth]
+        for index, mask in groups[group]:
+            if not mask & busy:
+                path[group] = index
+                if descend(depth + 1, busy | mask):
+                    return True
+        return False
+
+    return tuple(path) if descend(0, 0) else None
+
+
+def supported_options(groups):
+    """
+    Find, for each group, the options that appear in at least one valid schedule.
+
+    Arc consistency removes most unsupported options cheaply; each remaining
+    option is then confirmed by searching for one schedule that uses it.
+    Every schedule found confirms all of its options at once, so most
+    options never need a search of their own.
+
+    :param groups: A sequence of mask lists, one per course
+    :return: One set of option indices per group
+    """
+    domains = arc_consistency(groups)
+    supported = [set() for _ in groups]
+    if any(not domain for domain in domains):
+        return supported
+    candidates = [[(index, groups[group][index]) for index in domain] for group, domain in enumerate(domains)]
+    for group, options in enumerate(candidates):
+        for option in options:
+            if option[0] in supported[group]:
+                continue
+            fixed = list(candidates)
+            fixed[group] = [option]
+            path = _first_schedule(fixed)
+            if path is not None:
+                for other, index in enumerate(path):
+                    supported[other].add(index)
+    return supported
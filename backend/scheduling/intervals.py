@@ -0,0 +1,127 @@
+"""Interval index over section meeting times, for finding sections that fit given time windows."""
+from bisect import bisect_left
+from backend.scheduling.timegrid import DAYS, MINUTES_PER_DAY
+
+
+def day_windows(blocks):
+    """
+    Group ``(day_bits, start, end)`` blocks into sorted, merged windows per day.
+
+    Overlapping or touching windows are joined, so on any day a meeting
+    lies inside at most one window.
+
+    :return: One list of ``(start, end)`` pairs per day of ``DAYS``
+    """
+    per_day = [[] for _ in DAYS]
+    for day_bits, start, end in blocks:
+        for day in range(len(DAYS)):
+            if day_bits >> day & 1:
+                per_day[day].append((start, end))
+    merged = []
+    for windows in per_day:
+        joined = []
+        for start, end in sorted(windows):
+            if joined and start <= joined[-1][1]:
+                joined[-1] = (joined[-1][0], max(joined[-1][1], end))
+            else:
+                joined.append((start, end))
+        merged.append(joined)
+    return merged
+
+
+def free_windows(busy):
+    """Turn per-day busy windows from :func:`day_windows` into the free time around them."""
+    free = []
+    for windows in busy:
+        day_free = []
+        cursor = 0
+        for start, end in windows:
+            if start > cursor:
+                day_free.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < MINUTES_PER_DAY:
+            day_free.append((cursor, MINUTES_PER_DAY))
+        free.append(day_free)
+    return free
+
+
+def _intersect(first, second):
+    """Intersect two sorted lists of disjoint ``(start, end)`` windows."""
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if start < end:
+            result.append((start, end))
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class MeetingIndex(object):
+    """
+    Section meetings indexed by meeting-day pattern and start minute.
+
+    A section meets at the same time on each of its days, so it fits a set
+    of per-day windows exactly when its time lies inside the intersection of
+    the windows on all of its days. Sections are therefore grouped by day
+    pattern (``MW``, ``TR``, ...), each group sorted by start. A query works
+    out each pattern's intersected windows once, skips patterns that have
+    none, and uses two bisections per window to reach the sections that
+    start inside it. Only those sections are checked against the window's end.
+
+    Usage:
+        index = MeetingIndex(compiled_sections)
+        index.fitting(day_windows([(parse_days('TR'), 780, 960)]))
+    """
+
+    def __init__(self, compiled):
+        """
+        Create instance.
+
+        :param compiled: :class:`CompiledSection` objects, in the order results should keep
+        """
+        self.sections = []
+        patterns = {}
+        for option in compiled:
+            if not option.day_bits:
+                continue
+            patterns.setdefault(option.day_bits, []).append((option.start, option.end, len(self.sections)))
+            self.sections.append(option.section)
+        self._patterns = {}
+        for day_bits, meetings in patterns.items():
+            meetings.sort()
+            self._patterns[day_bits] = (
+                [start for start, _, _ in meetings],
+                [end for _, end, _ in meetings],
+                [number for _, _, number in meetings],
+            )
+
+    def __len__(self):
+        return len(self.sections)
+
+    def fitting(self, windows):
+        """
+        Return the sections whose every meeting lies entirely inside one of ``windows``.
+
+        :param windows: Merged per-day windows, as built by :func:`day_windows`
+            or :func:`free_windows`
+        :return: The matching sections, in the order the index was built with
+        """
+        matched = []
+        for day_bits, (starts, ends, numbers) in self._patterns.items():
+            shared = None
+            for day in range(len(DAYS)):
+                if day_bits >> day & 1:
+                    shared = windows[day] if shared is None else _intersect(shared, windows[day])
+                    if not shared:
+                        break
+            for window_start, window_end in shared or ():
+                for position in range(bisect_left(starts, window_start), bisect_left(starts, window_end)):
+                    if ends[position] <= window_end:
+                        matched.append(numbers[position])
+        matched.sort()
+        return [self.sections[number] for number in matched]
@@ -0,0 +1,147 @@
+"""Process-pool schedule search for selections too large to search on one core."""
+import multiprocessing
+import os
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import prod
+from backend.scheduling.solver import SearchStats, iter_schedules
+from backend.scheduling.timegrid import meeting_mask
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def search_space(groups):
+    """The number of combinations a search over ``groups`` could visit, before pruning."""
+    return prod(len(group) for group in groups)
+
+
+def encode_groups(option_groups):
+    """
+    Reduce compiled option groups to ``(day_bits, start, end)`` triples.
+
+    The triples are a few bytes each, whereas a week mask runs to about a
+    kilobyte, so this is what gets sent to the pool; workers rebuild the
+    masks with :func:`meeting_mask`.
+    """
+    return tuple(
+        tuple((option.day_bits, option.start, option.end) for option in options)
+        for options in option_groups
+    )
+
+
+def split_prefixes(groups, depth, stats=None):
+    """Return the conflict-free index prefixes of the first ``depth`` groups, in search order."""
+    return list(iter_schedules(groups[:depth], stats=stats))
+
+
+def _search_subtree(encoded, prefix, occupied_triples):
+    """
+    Worker entry point: every schedule that starts with ``prefix``.
+
+    Options clashing with the prefix are dropped before the search, which
+    keeps index order and therefore the order results come out in.
+
+    :return: ``(packed paths, nodes placed)``
+    """
+    occupied = 0
+    for day_bits, start, end in occupied_triples:
+        occupied |= meeting_mask(day_bits, start, end)
+
+    remaining = []
+    for triples in encoded[len(prefix):]:
+        remaining.append([
+            (index, mask)
+            for index, mask in ((i, meeting_mask(*triple)) for i, triple in enumerate(triples))
+            if not mask & occupied
+        ])
+
+    packed = array('H')
+    stats = SearchStats()
+    for path in iter_schedules([[mask for _, mask in options] for options in remaining], stats=stats):
+        packed.extend(prefix)
+        packed.extend(options[index][0] for options, index in zip(remaining, path))
+    return packed.tobytes(), stats.nodes
+
+
+def _unpack(data, width):
+    flat = array('H')
+    flat.frombytes(data)
+    return [tuple(flat[start:start + width]) for start in range(0, len(flat), width)]
+
+
+def pool(workers):
+    """Return this process's search pool, starting it on first use."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            # Spawned children do not inherit the app, its connections or its threads
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _reset_after_fork():
+    # A forked worker must start its own pool rather than share the parent's
+    global _executor, _executor_workers, _executor_lock
+    _executor = None
+    _executor_workers = 0
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def iter_schedules_parallel(option_groups, workers, stats=None, depth=None):
+    """
+    Yield the same paths as :func:`iter_schedules`, in the same order, using a process pool.
+
+    The tree is split at the first one or two groups; each conflict-free
+    prefix becomes one task. At most ``2 * workers`` tasks are in flight and
+    their results are yielded strictly in prefix order, so the output is
+    deterministic and memory stays bounded however large the search is.
+
+    :param option_groups: Lists of :class:`CompiledSection`, one per course
+    :param workers: Size of the process pool
+    :param stats: Optional :class:`SearchStats` to add the placed-section count to
+    :param depth: Groups to split at; by default 1, or 2 when the first group
+        alone gives fewer than ``4 * workers`` tasks
+    """
+    groups = [[option.mask for option in options] for options in option_groups]
+    if depth is None:
+        depth = 1 if len(groups) < 3 or len(groups[0]) >= 4 * workers else 2
+    depth = min(depth, len(groups) - 1)
+    if depth < 1:
+        yield from iter_schedules(groups, stats=stats)
+        return
+
+    encoded = encode_groups(option_groups)
+    width = len(groups)
+    executor = pool(workers)
+    prefixes = iter(split_prefixes(groups, depth, stats=stats))
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < 2 * workers:
+                prefix = next(prefixes, None)
+                if prefix is None:
+                    break
+                occupied = tuple(encoded[level][index] for level, index in enumerate(prefix))
+                pending.append(executor.submit(_search_subtree, encoded, prefix, occupied))
+            if not pending:
+                return
+            data, nodes = pending.popleft().result()
+            if stats is not None:
+                stats.nodes += nodes
+            yield from _unpack(data, width)
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,218 @@
+"""Branch-and-bound search for the best few schedules under student preferences."""
+import heapq
+from itertools import count
+from backend.scheduling.timegrid import DAYS, MINUTES_PER_DAY, parse_time
+
+MAX_TOP_K = 100
+
+
+class Preferences(object):
+    """
+    Scoring weights for ranked schedule generation. Lower scores are better.
+
+    - ``gaps``: cost per idle minute between classes on the same day
+    - ``early``: cost per class minute before ``earliest_start``, per meeting day
+    - ``days``: cost per weekday with at least one class
+    - ``instructor``: bonus per section taught by one of ``instructors``
+    """
+
+    DEFAULT_WEIGHTS = {'gaps': 1.0, 'early': 1.0, 'days': 60.0, 'instructor': 30.0}
+
+    def __init__(self, top_k=10, weights=None, earliest_start='0900', instructors=()):
+        """Create instance."""
+        self.top_k = top_k
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+        self.earliest_start = parse_time(earliest_start)
+        self.instructors = frozenset(name.strip().lower() for name in instructors)
+
+    @staticmethod
+    def from_json(json_data):
+        """
+        Convert the ``preferences`` object of a generate request to Preferences.
+
+        :raises ValueError: If a weight or option is malformed
+        """
+        if not isinstance(json_data, dict):
+            raise ValueError("preferences must be an object")
+        try:
+            top_k = int(json_data.get('top_k', 10))
+            weights = {name: float(value) for name, value in (json_data.get('weights') or {}).items()}
+        except (TypeError, ValueError, AttributeError):
+            raise ValueError("top_k must be an integer and weights must be numbers")
+        if not 1 <= top_k <= MAX_TOP_K:
+            raise ValueError(f"top_k must be between 1 and {MAX_TOP_K}")
+        unknown = set(weights) - set(Preferences.DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown preference weights: {', '.join(sorted(unknown))}")
+        if any(value < 0 for value in weights.values()):
+            raise ValueError("Preference weights must not be negative")
+        instructors = json_data.get('instructors') or []
+        if not isinstance(instructors, list):
+            raise ValueError("instructors must be a list of names")
+        return Preferences(
+            top_k=top_k,
+            weights=weights,
+            earliest_start=json_data.get('earliest_start', '0900'),
+            instructors=[str(name) for name in instructors]
+        )
+
+    def section_cost(self, option):
+        """Return the part of the score that a single compiled section adds on its own."""
+        section = option.section
+        if section is None:
+            return 0.0
+        cost = 0.0
+        early = min(option.end, self.earliest_start) - option.start
+        if early > 0:
+            cost += self.weights['early'] * early * option.day_bits.bit_count()
+        if section.instructor and section.instructor.strip().lower() in self.instructors:
+            cost -= self.weights['instructor']
+        return cost
+
+
+def top_schedules(section_options, preferences, stats=None):
+    """
+    Find the ``preferences.top_k`` lowest-scoring conflict-free schedules.
+
+    The search is a depth-first branch and bound. Options inside each course
+    are tried cheapest first, and once ``top_k`` schedules are held in a
+    bounded heap any branch whose optimistic score cannot beat the current
+    worst of them is cut. For the courses still to place, the optimistic
+    score counts their cheapest section costs, the fewest days any one of
+    them must add to the week, and the idle time already on the schedule
+    that their longest meetings could not fill. Ties keep the schedule that
+    was found first.
+
+    :param section_options: One list of :class:`CompiledSection` per course
+    :param preferences: The :class:`Preferences` to score with
+    :param stats: Optional :class:`SearchStats` whose ``nodes`` counts the sections placed
+    :return: A list of ``(score, path)`` pairs, best first, where ``path``
+        indexes into ``section_options`` like :func:`iter_schedules` does
+    """
+    top_k = preferences.top_k
+    day_weight = preferences.weights['days']
+    gap_weight = preferences.weights['gaps']
+    depth_limit = len(section_options)
+    week = range(len(DAYS))
+
+    levels = []
+    # patterns[d]: the distinct day sets level d's options can add
+    # fill[d][day]: the most class minutes levels d onward can add on that day
+    patterns = []
+    fill = [[0] * len(DAYS) for _ in range(depth_limit + 1)]
+    for depth, options in enumerate(section_options):
+        level = []
+        for index, option in enumerate(options):
+            # Reserved blocks block time but add no days or gaps
+            meets = () if option.section is None else tuple(
+                day for day in week if option.day_bits >> day & 1
+            )
+            level.append((
+                preferences.section_cost(option),
+                option.mask,
+                option.day_bits if meets else 0,
+                meets,
+                option.start,
+                option.end,
+                index
+            ))
+            for day in meets:
+                fill[depth][day] = max(fill[depth][day], option.end - option.start)
+        level.sort(key=lambda item: item[0])
+        levels.append(level)
+        patterns.append({item[2] for item in level})
+    for depth in range(depth_limit - 1, -1, -1):
+        fill[depth] = [minutes + later for minutes, later in zip(fill[depth], fill[depth + 1])]
+
+    # remaining[d]: the cheapest additive cost still to come from levels d onward
+    remaining = [0.0] * (depth_limit + 1)
+    for depth in range(depth_limit - 1, -1, -1):
+        remaining[depth] = remaining[depth + 1] + (levels[depth][0][0] if levels[depth] else 0.0)
+
+    # fewest_days(d, days): the fewest class days a schedule can end with when
+    # ``days`` are taken before level d. Every later level adds one of its
+    # patterns, so the week is at least the smallest such union for each.
+    known_days = [{} for _ in range(depth_limit + 1)]
+
+    def fewest_days(depth, days):
+        fewest = known_days[depth].get(days)
+        if fewest is None:
+            fewest = days.bit_count()
+            if depth < depth_limit:
+                fewest = max(
+                    fewest_days(depth + 1, days),
+                    min(((days | pattern).bit_count() for pattern in patterns[depth]), default=0)
+                )
+            known_days[depth][days] = fewest
+        return fewest
+
+    # Per day: first class minute, last class minute and minutes in class so far
+    first = [MINUTES_PER_DAY] * len(DAYS)
+    last = [0] * len(DAYS)
+    busy_minutes = [0] * len(DAYS)
+
+    def idle(depth):
+        # Idle time already on the schedule that levels from ``depth`` could
+        # not fill even if every one of them landed inside today's gaps
+        total = 0
+        room = fill[depth]
+        for day in week:
+            gap = last[day] - first[day] - busy_minutes[day] - room[day]
+            if gap > 0:
+                total += gap
+        return total
+
+    heap = []
+    found = count()
+    path = [0] * depth_limit
+    placed = 0
+
+    def search(depth, busy, class_days, cost):
+        nonlocal placed
+        if depth == depth_limit:
+            score = cost + day_weight * class_days.bit_count() + gap_weight * idle(depth)
+            entry = (-score, -next(found), tuple(path))
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            return
+
+        base = floor = worst = None
+        for option_cost, mask, days, meets, start, end, index in levels[depth]:
+            if mask & busy:
+                continue
+            if worst is None and len(heap) == top_k:
+                worst = -heap[0][0]
+                base = cost + remaining[depth + 1]
+                if gap_weight:
+                    base += gap_weight * idle(depth)
+                floor = base + day_weight * fewest_days(depth, class_days)
+            if worst is not None:
+                if option_cost + floor >= worst:
+                    # Options are sorted by cost, so no later one can do better.
+                    break
+                if option_cost + base + day_weight * fewest_days(depth + 1, class_days | days) >= worst:
+                    continue
+            placed += 1
+            path[depth] = index
+            length = end - start
+            saved = [(first[day], last[day]) for day in meets]
+            for day in meets:
+                if start < first[day]:
+                    first[day] = start
+                if end > last[day]:
+                    last[day] = end
+                busy_minutes[day] += length
+            search(depth + 1, busy | mask, class_days | days, cost + option_cost)
+            for day, (day_first, day_last) in zip(meets, saved):
+                first[day] = day_first
+                last[day] = day_last
+                busy_minutes[day] -= length
+            if worst is not None:
+                worst = -heap[0][0]
+
+    search(0, 0, 0, 0.0)
+    if stats is not None:
+        stats.nodes += placed
+    return [(-negative_score, ranked_path) for negative_score, _, ranked_path in sorted(heap, reverse=True)]
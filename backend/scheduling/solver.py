@@ -0,0 +1,90 @@
+"""Backtracking search over course section combinations."""
+
+
+class SearchStats(object):
+    """Counters a search fills in as it runs, for instrumentation."""
+
+    def __init__(self):
+        """Create instance."""
+        self.nodes = 0
+
+    def to_json(self):
+        """Convert the counters to a JSON-serializable dict."""
+        return {'nodes': self.nodes}
+
+
+def iter_schedules(groups, after=None, stats=None):
+    """
+    Yield every conflict-free combination that picks one option from each group.
+
+    Each group is a list of weekly meeting masks (see
+    :mod:`backend.scheduling.timegrid`). Groups are placed one at a time in the
+    given order, keeping the union of the masks placed so far, and a candidate
+    is rejected with a single AND as soon as it clashes, so the full Cartesian
+    product is never built. Combinations come out in the same order as
+    ``itertools.product(*groups)`` would produce them.
+
+    Passing a previously yielded path as ``after`` resumes the search with
+    the combination that follows it, which is how paged requests continue
+    without keeping earlier results around.
+
+    Usage:
+        for path in iter_schedules([[a1.mask, a2.mask], [b1.mask]]):
+            print(path)  # (0, 0), (1, 0), ...
+
+    :param groups: A sequence of mask lists, one per course
+    :param after: An index tuple to resume after, or None to start from the top
+    :param stats: Optional :class:`SearchStats` whose ``nodes`` counts the sections placed
+    :return: A generator of index tuples, one index into each group
+    :raises ValueError: If ``after`` does not address an option in every group
+    """
+    depth_limit = len(groups)
+    if depth_limit == 0:
+        if after is None:
+            yield ()
+        return
+
+    last = depth_limit - 1
+    occupied = [0] * depth_limit
+    positions = [0] * depth_limit
+    depth = 0
+    if after is not None:
+        if len(after) != depth_limit or not all(
+                0 <= index < len(masks) for index, masks in zip(after, groups)):
+            raise ValueError("Resume point does not match the requested courses")
+        positions = list(after)
+        for level in range(last):
+            occupied[level + 1] = occupied[level] | groups[level][positions[level]]
+        depth = last
+        positions[depth] += 1
+
+    placed = 0
+    try:
+        while depth >= 0:
+            masks = groups[depth]
+            busy = occupied[depth]
+            count = len(masks)
+            index = positions[depth]
+            while index < count and masks[index] & busy:
+                index += 1
+
+            if index == count:
+                # Exhausted this course: step back and advance the previous one.
+                depth -= 1
+                if depth >= 0:
+                    positions[depth] += 1
+                continue
+
+            placed += 1
+            positions[depth] = index
+            if depth == last:
+                yield tuple(positions)
+                positions[depth] = index + 1
+            else:
+                depth += 1
+                occupied[depth] = busy | masks[index]
+                positions[depth] = 0
+    finally:
+        # Also runs when a caller stops early and the generator is closed.
+        if stats is not None:
+            stats.nodes += placed
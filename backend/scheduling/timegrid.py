@@ -0,0 +1,112 @@
+"""Weekly time grid used to turn section meeting times into conflict bitmasks."""
+from collections import namedtuple
+
+DAYS = 'MTWRFSU'
+MINUTES_PER_DAY = 24 * 60
+DAY_MASK = (1 << MINUTES_PER_DAY) - 1
+
+CompiledSection = namedtuple('CompiledSection', ['mask', 'day_bits', 'start', 'end', 'section'])
+CompiledSection.__doc__ = """
+A section reduced to its weekly footprint.
+
+``mask`` has one bit per minute of the week (day-major), so two sections
+conflict exactly when ``a.mask & b.mask`` is non-zero. ``section`` carries the
+original object through the search untouched.
+"""
+
+
+def parse_time(value):
+    """
+    Convert an ``HHMM`` time into minutes since midnight.
+
+    Usage:
+        parse_time('0915')  # 555
+
+    :param value: The time as a string or integer in HHMM form
+    :return: The number of minutes since midnight
+    :raises ValueError: If the value is not a valid time of day
+    """
+    text = str(value).strip()
+    if not text.isdigit() or not 3 <= len(text) <= 4:
+        raise ValueError(f"Invalid time {value!r}, expected HHMM")
+    hours, minutes = divmod(int(text), 100)
+    if minutes >= 60 or hours > 24 or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time {value!r}, expected HHMM")
+    return hours * 60 + minutes
+
+
+def parse_days(days):
+    """
+    Convert meeting days such as ``"MWF"`` or ``['T', 'R']`` into a day bitmask.
+
+    :param days: A string or iterable of day letters from ``DAYS``
+    :return: An integer with bit ``i`` set when the section meets on ``DAYS[i]``
+    :raises ValueError: If a day letter is not recognised
+    """
+    day_bits = 0
+    for day in days:
+        index = DAYS.find(day.upper()) if len(day) == 1 else -1
+        if index < 0:
+            raise ValueError(f"Invalid meeting day {day!r}, expected one of {DAYS}")
+        day_bits |= 1 << index
+    return day_bits
+
+
+def meeting_mask(day_bits, start, end):
+    """Build the weekly minute mask for a meeting on ``day_bits`` from ``start`` to ``end``."""
+    if end <= start:
+        raise ValueError("Meeting must end after it starts")
+    span = ((1 << (end - start)) - 1) << start
+    mask = 0
+    for index in range(len(DAYS)):
+        if day_bits >> index & 1:
+            mask |= span << (index * MINUTES_PER_DAY)
+    return mask
+
+
+def idle_minutes(mask):
+    """
+    Count the minutes between the first and last busy minute of each day that are free.
+
+    :param mask: A weekly minute mask, usually the union of a schedule's sections
+    :return: The total idle minutes across the week
+    """
+    total = 0
+    while mask:
+        day = mask & DAY_MASK
+        if day:
+            first = (day & -day).bit_length() - 1
+            total += day.bit_length() - first - day.bit_count()
+        mask >>= MINUTES_PER_DAY
+    return total
+
+
+def compile_meeting(days, start_time, end_time, section=None):
+    """
+    Parse a meeting once and return its :class:`CompiledSection`.
+
+    :param days: Meeting days, as accepted by :func:`parse_days`
+    :param start_time: Start time in HHMM form
+    :param end_time: End time in HHMM form
+    :param section: Payload to carry along with the compiled meeting
+    :raises ValueError: If the days or times are malformed
+    """
+    day_bits = parse_days(days)
+    start = parse_time(start_time)
+    end = parse_time(end_time)
+    return CompiledSection(meeting_mask(day_bits, start, end), day_bits, start, end, section)
+
+
+def compile_section(section):
+    """
+    Compile a ``CourseSection`` (or anything with the same time fields).
+
+    The normalized ``day_mask``/``start_minute``/``end_minute`` columns are used
+    when they are set, so no strings are parsed; older rows without them fall
+    back to parsing ``days``/``start_time``/``end_time``.
+    """
+    day_bits = getattr(section, 'day_mask', None)
+    if day_bits is None:
+        return compile_meeting(section.days, section.start_time, section.end_time, section)
+    start, end = section.start_minute, section.end_minute
+    return CompiledSection(meeting_mask(day_bits, start, end), day_bits, start, end, section)
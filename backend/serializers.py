@@ -0,0 +1,83 @@
+"""Per-model field plans for turning rows into JSON-ready dicts."""
+import threading
+from collections import namedtuple
+from sqlalchemy import select
+from backend.extensions import db
+
+FieldPlan = namedtuple('FieldPlan', ['columns', 'names', 'keys'])
+FieldPlan.__doc__ = """
+The columns one serializer emits, worked out once per model and visibility.
+
+``columns`` are the table's Column objects, ``names`` the mapped attribute
+names and ``keys`` the lowercased names used in JSON.
+"""
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def field_plan(model, private=False, only=None):
+    """
+    Return the cached :class:`FieldPlan` for a model.
+
+    Internal columns are never included; private columns only when
+    ``private`` is set. ``only`` restricts and orders the fields by name.
+
+    Usage:
+        plan = field_plan(Course, only=('department_id', 'course_number', 'course_title'))
+    """
+    cache_key = (model, private, tuple(only) if only is not None else None)
+    plan = _plans.get(cache_key)
+    if plan is None:
+        table_columns = model.__table__.columns
+        if only is not None:
+            columns = [table_columns[name] for name in only]
+        else:
+            columns = list(table_columns)
+        columns = [
+            column for column in columns
+            if not getattr(column, 'isInternal', False)
+            and (private or not getattr(column, 'isPrivate', False))
+        ]
+        plan = FieldPlan(
+            tuple(columns),
+            tuple(column.name for column in columns),
+            tuple(column.name.lower() for column in columns)
+        )
+        with _plans_lock:
+            plan = _plans.setdefault(cache_key, plan)
+    return plan
+
+
+def serialize(instance, private=False, only=None):
+    """Serialize one model instance with its model's field plan."""
+    plan = field_plan(type(instance), private, only)
+    return {key: getattr(instance, name) for key, name in zip(plan.keys, plan.names)}
+
+
+def select_rows(model, *criteria, private=False, only=None, order_by=None):
+    """
+    Query a model's table with Core and return JSON-ready dicts.
+
+    Only the planned columns are selected and each result tuple is zipped
+    straight into a dict, so no ORM objects are built.
+
+    Usage:
+        rows = select_rows(CourseSection, CourseSection.department_id == 'CPSC',
+                           only=SECTION_FIELDS, order_by=CourseSection.id)
+
+    :param model: The model class to read
+    :param criteria: Optional WHERE clauses
+    :param private: Include private columns
+    :param only: Restrict and order the fields by name
+    :param order_by: Optional ORDER BY clause
+    :return: A list of dicts keyed by the plan's JSON keys
+    """
+    plan = field_plan(model, private, only)
+    statement = select(*plan.columns)
+    if criteria:
+        statement = statement.where(*criteria)
+    if order_by is not None:
+        statement = statement.order_by(order_by)
+    keys = plan.keys
+    return [dict(zip(keys, row)) for row in db.session.execute(statement)]
@@ -0,0 +1 @@
+"""Benchmarks for the scheduling, catalog and auth hot paths."""
@@ -0,0 +1,94 @@
+"""Course catalogs for the benchmarks: the registrar sample and synthetic ones of any size."""
+import csv
+import os
+import random
+
+SAMPLE_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'CPSC 4392 Fall 2024. Project Input Data.csv'
+)
+
+DEPARTMENTS = ('CPSC', 'MATH', 'PHYS', 'CHEM', 'BIOL', 'ENGL', 'HIST', 'ECON', 'PSYC', 'ARTS')
+DAY_PATTERNS = ('MW', 'TR', 'MWF', 'F', 'MTWR')
+# (start, length) in minutes since midnight; the first few are the popular "peak" slots
+TIME_SLOTS = tuple(
+    (start, length)
+    for start in range(8 * 60, 20 * 60, 85)
+    for length in (50, 75)
+)
+PEAK_SLOTS = 3
+
+
+def _hhmm(minutes):
+    return f'{minutes // 60:02d}{minutes % 60:02d}'
+
+
+def sample_sections():
+    """Read the registrar's sample export as section payloads for ``POST /courses/sections``."""
+    with open(SAMPLE_CSV, newline='', encoding='utf-8-sig') as f:
+        return [
+            {
+                'departmentId': row['Department ID'],
+                'courseNumber': row['Course #'],
+                'courseTitle': row['Course Title'],
+                'sectionId': row['Sec #'],
+                'instructor': row['Instructor'],
+                'days': row['Days'],
+                'startTime': row['Start Time'],
+                'endTime': row['End Time'],
+            }
+            for row in csv.DictReader(f)
+            if row.get('Department ID')
+        ]
+
+
+def synthetic_sections(count, sections_per_course=4, conflict_density=0.5, seed=0):
+    """
+    Build ``count`` section payloads spread over ``count / sections_per_course`` courses.
+
+    :param conflict_density: Share of sections (0 to 1) placed in the few peak
+        time slots rather than anywhere in the day; higher values make more
+        section pairs overlap and prune more of the search
+    :param seed: Seed for the random generator, so runs are reproducible
+    """
+    if not 0 <= conflict_density <= 1:
+        raise ValueError('conflict_density must be between 0 and 1')
+    rng = random.Random(seed)
+    sections = []
+    course_count = max(1, -(-count // sections_per_course))
+    for course_index in range(course_count):
+        department = DEPARTMENTS[course_index % len(DEPARTMENTS)]
+        course_number = str(1000 + course_index // len(DEPARTMENTS))
+        for section_index in range(sections_per_course):
+            if len(sections) == count:
+                break
+            if rng.random() < conflict_density:
+                start, length = rng.choice(TIME_SLOTS[:PEAK_SLOTS])
+                days = rng.choice(DAY_PATTERNS[:2])
+            else:
+                start, length = rng.choice(TIME_SLOTS)
+                days = rng.choice(DAY_PATTERNS)
+            sections.append({
+                'departmentId': department,
+                'courseNumber': course_number,
+                'courseTitle': f'{department} Course {course_number}',
+                'sectionId': f'{section_index + 1:02d}',
+                'instructor': f'Instructor {rng.randrange(count // 10 + 1)}',
+                'days': days,
+                'startTime': _hhmm(start),
+                'endTime': _hhmm(start + length),
+            })
+    return sections
+
+
+def courses_for(sections):
+    """Distinct course payloads for ``POST /courses``, in first-seen order."""
+    courses = {}
+    for section in sections:
+        key = (section['departmentId'], section['courseNumber'])
+        courses.setdefault(key, {
+            'departmentId': section['departmentId'],
+            'courseNumber': section['courseNumber'],
+            'courseTitle': section['courseTitle'],
+        })
+    return list(courses.values())
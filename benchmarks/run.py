@@ -0,0 +1,300 @@
+"""
+Run the benchmark suite against an in-memory SQLite app.
+
+Usage:
+    python -m benchmarks.run --sizes sample,1000,10000 --output results.json
+    python -m benchmarks.run --baseline results.json --output new.json
+
+Each catalog size gets a fresh app. Every case reports the minimum, median
+and mean wall time over ``--repeat`` runs; with ``--baseline`` the medians
+are compared against an earlier results file, and the exit status is 1 if
+any case slowed down by more than ``--tolerance``.
+"""
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from benchmarks.catalog import courses_for, sample_sections, synthetic_sections
+
+DEFAULT_SIZES = 'sample,1000,10000'
+DEFAULT_COURSE_COUNTS = '2,4,6'
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'benchmark-password'
+
+
+def measure(fn, repeat, warmup=1):
+    """Time ``fn`` ``repeat`` times after ``warmup`` untimed calls, in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+    }
+
+
+def build_app(bcrypt_rounds=None):
+    """Create the app on a fresh in-memory database with the schema in place."""
+    from backend import create_backend
+    from backend.extensions import db
+
+    config = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SECRET_KEY': 'benchmark-secret',
+        'EMAIL_VERIFICATION_SALT': 'benchmark-salt',
+        'MAIL_SUPPRESS_SEND': True,
+        'MAIL_OUTBOX_THREAD': False,
+        # Search cases must time the solver; the *_cached cases switch the cache on explicitly
+        'SCHEDULE_CACHE': False,
+    }
+    if bcrypt_rounds is not None:
+        config['BCRYPT_LOG_ROUNDS'] = bcrypt_rounds
+    app = create_backend(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _check(response, *statuses):
+    if response.status_code not in statuses:
+        raise RuntimeError(f'Unexpected {response.status_code}: {response.get_data(as_text=True)[:200]}')
+    return response
+
+
+def _changed_copy(sections, share, seed):
+    """Copy ``sections`` with ``share`` of them moved to another instructor."""
+    rng = random.Random(seed)
+    changed = [dict(section) for section in sections]
+    for section in rng.sample(changed, int(len(changed) * share)):
+        section['instructor'] = f"{section['instructor']} (alt)"
+    return changed
+
+
+def bench_catalog_writes(client, sections, repeat):
+    """Bulk replace through ``POST /courses/sections``: no-op saves and 10% edits."""
+    results = {}
+    results['replace_unchanged'] = measure(
+        lambda: _check(client.post('/api/catalog/courses/sections', json=sections), 201), repeat
+    )
+    variants = [_changed_copy(sections, 0.1, seed) for seed in (1, 2)]
+    state = {'next': 0}
+
+    def replace_changed():
+        payload = variants[state['next'] % 2]
+        state['next'] += 1
+        _check(client.post('/api/catalog/courses/sections', json=payload), 201)
+
+    results['replace_10pct_changed'] = measure(replace_changed, repeat)
+    _check(client.post('/api/catalog/courses/sections', json=sections), 201)
+    return results
+
+
+def bench_catalog_reads(app, client, sections, repeat):
+    """Catalog reads from a warm snapshot, a cold one, and conditional 304s."""
+    results = {}
+    url = '/api/catalog/courses/sections/all'
+    results['sections_all_warm'] = measure(lambda: _check(client.get(url), 200), repeat)
+
+    def cold():
+        # Drop the worker's snapshot so the read rebuilds it from the database
+        app.extensions.pop('catalog_snapshot', None)
+        _check(client.get(url), 200)
+
+    results['sections_all_cold'] = measure(cold, repeat)
+
+    etag = _check(client.get(url), 200).headers.get('ETag')
+    results['sections_all_not_modified'] = measure(
+        lambda: _check(client.get(url, headers={'If-None-Match': etag}), 304), repeat
+    )
+    first = sections[0]
+    results['course_sections'] = measure(lambda: _check(client.get(
+        '/api/catalog/courses/sections',
+        json={'department_id': first['departmentId'], 'course_number': first['courseNumber']}
+    ), 200), repeat)
+    results['courses'] = measure(lambda: _check(client.get('/api/catalog/courses'), 200), repeat)
+    return results
+
+
+def bench_generate(app, client, sections, course_counts, repeat, seed):
+    """
+    ``POST /api/schedule/generate`` for growing numbers of courses, in each response mode.
+
+    The plain cases run with the result cache off, so they time the search;
+    the ``*_cached`` cases turn it on and time a warm cache hit.
+    """
+    courses = courses_for(sections)
+    rng = random.Random(seed)
+    results = {}
+    for count in course_counts:
+        if count > len(courses):
+            continue
+        picked = [
+            {'department_id': course['departmentId'], 'course_number': course['courseNumber']}
+            for course in rng.sample(courses, count)
+        ]
+        request = {'courses': picked, 'reserved': []}
+        results[f'generate_{count}_courses'] = measure(lambda: _check(
+            client.post('/api/schedule/generate', json=request), 200, 404
+        ), repeat)
+        results[f'generate_{count}_courses_page'] = measure(lambda: _check(
+            client.post('/api/schedule/generate', json=dict(request, limit=50)), 200, 404
+        ), repeat)
+        results[f'generate_{count}_courses_ranked'] = measure(lambda: _check(
+            client.post('/api/schedule/generate', json=dict(request, preferences={'top_k': 10})), 200, 404
+        ), repeat)
+
+        app.config['SCHEDULE_CACHE'] = True
+        try:
+            results[f'generate_{count}_courses_cached'] = measure(lambda: _check(
+                client.post('/api/schedule/generate', json=request), 200, 404
+            ), repeat)
+            results[f'generate_{count}_courses_page_cached'] = measure(lambda: _check(
+                client.post('/api/schedule/generate', json=dict(request, limit=50)), 200, 404
+            ), repeat)
+        finally:
+            app.config['SCHEDULE_CACHE'] = False
+    return results
+
+
+def bench_auth(app, client, repeat):
+    """Token verification (cached and uncached) and a full login."""
+    from backend.auth import authenticate, principal_cache
+    from backend.extensions import db
+    from backend.models.user import User, UserType
+
+    with app.app_context():
+        user = User(email=BENCH_EMAIL, password=BENCH_PASSWORD, user_type=UserType.STUDENT, verified=True)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token, _ = user.generate_token()
+
+    results = {}
+    with app.test_request_context():
+        authenticate(token)
+        results['token_check_cached'] = measure(lambda: authenticate(token), repeat * 10)
+
+        def uncached():
+            principal_cache().discard([user_id])
+            authenticate(token)
+
+        results['token_check_uncached'] = measure(uncached, repeat * 10)
+        db.session.remove()
+
+    credentials = {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}
+    results['login'] = measure(lambda: _check(client.post('/api/user/login', json=credentials), 200), repeat)
+    return results
+
+
+def run_size(size, args):
+    """Run every benchmark against one catalog size and return ``{case: timings}``."""
+    if size == 'sample':
+        sections = sample_sections()
+    else:
+        sections = synthetic_sections(
+            int(size),
+            sections_per_course=args.sections_per_course,
+            conflict_density=args.conflict_density,
+            seed=args.seed
+        )
+    app = build_app(args.bcrypt_rounds)
+    client = app.test_client()
+    _check(client.post('/api/catalog/courses', json=courses_for(sections)), 201)
+
+    results = {}
+    results.update(bench_catalog_writes(client, sections, args.repeat))
+    results.update(bench_catalog_reads(app, client, sections, args.repeat))
+    results.update(bench_generate(app, client, sections, args.course_counts, args.repeat, args.seed))
+    results.update(bench_auth(app, client, args.repeat))
+    return {'sections': len(sections), 'cases': results}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print median timings next to the baseline's.
+
+    :return: The ``(size, case)`` pairs that got slower by more than ``tolerance``
+    """
+    regressions = []
+    for size, run in results['sizes'].items():
+        base_cases = baseline.get('sizes', {}).get(size, {}).get('cases', {})
+        for case, timings in run['cases'].items():
+            base = base_cases.get(case)
+            if base is None:
+                print(f'{size:>8} {case:<36} {timings["median_ms"]:>10.3f} ms  (new)')
+                continue
+            ratio = timings['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+            flag = ''
+            if ratio > 1 + tolerance:
+                flag = '  SLOWER'
+                regressions.append((size, case))
+            elif ratio < 1 - tolerance:
+                flag = '  faster'
+            print(f'{size:>8} {case:<36} {timings["median_ms"]:>10.3f} ms  x{ratio:.2f}{flag}')
+    return regressions
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='Comma-separated catalog sizes: "sample" or a number of sections (up to 50000)')
+    parser.add_argument('--course-counts', type=_int_list, default=_int_list(DEFAULT_COURSE_COUNTS),
+                        help='Comma-separated numbers of courses per generate request')
+    parser.add_argument('--sections-per-course', type=int, default=4)
+    parser.add_argument('--conflict-density', type=float, default=0.5,
+                        help='Share of synthetic sections placed in peak time slots (0 to 1)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--bcrypt-rounds', type=int, default=None,
+                        help='BCRYPT_LOG_ROUNDS for the login case (defaults to the app setting)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against an earlier results file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed slowdown of a median against the baseline (0.1 = 10%%)')
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'created': dt.datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+        'sizes': {},
+    }
+    for size in (item.strip() for item in args.sizes.split(',') if item.strip()):
+        print(f'Running catalog size {size}...', file=sys.stderr)
+        results['sizes'][size] = run_size(size, args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    else:
+        for size, run in results['sizes'].items():
+            for case, timings in run['cases'].items():
+                print(f'{size:>8} {case:<36} {timings["median_ms"]:>10.3f} ms')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,13 @@
-import multiprocessing
+import glob
+import os
+from backend.deployment import current_profile
+
+# Deployment profile: GUNICORN_PROFILE=sync|gthread|gevent (see backend/deployment.py)
+profile = current_profile()
 
 # Basic config
 bind = "0.0.0.0:8000"
-workers = multiprocessing.cpu_count() * 2 + 1
+workers = profile.workers
 timeout = 120
 keepalive = 5
 
@@ -14,11 +19,38 @@ loglevel = "info"
 # Process naming
 proc_name = "innovaid_backend"
 # Worker class
-worker_class = "sync"
+worker_class = profile.worker_class
+threads = profile.threads
+if profile.worker_connections:
+    worker_connections = profile.worker_connections
 
-# Preload app
+# Preload app (workers reset inherited DB connections after fork)
 preload_app = True
 
 # Max requests
 max_requests = 1000
 max_requests_jitter = 50
+
+
+# Verification emails: each worker runs an outbox sender thread (MAIL_OUTBOX_THREAD,
+# on by default). Start it at boot so messages queued or retried before a restart go
+# out without waiting for the next registration. With MAIL_OUTBOX_THREAD = False,
+# run `flask send-mail` as its own process instead.
+def post_worker_init(worker):
+    from backend.mailer import start_outbox_sender
+    start_outbox_sender(worker.wsgi)
+
+
+# Prometheus multiprocess mode: workers share samples through PROMETHEUS_MULTIPROC_DIR
+def on_starting(server):
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(metrics_dir, '*.db')):
+            os.remove(stale)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,64 @@
+"""Baseline schema: users, registration queue and catalog tables
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=80), nullable=False),
+    sa.Column('password', sa.LargeBinary(length=128), nullable=True),
+    sa.Column('verified', sa.Boolean(), nullable=True),
+    sa.Column('user_type', sa.Enum('STUDENT', 'ROOT', 'ADMIN', name='usertype'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('registration_queue',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('approved', sa.Boolean(), nullable=False),
+    sa.Column('request_type', sa.Enum('ADMIN', 'ROOT', name='requesttype'), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('courses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.String(length=4), nullable=False),
+    sa.Column('course_number', sa.String(length=4), nullable=False),
+    sa.Column('course_title', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('department_id', 'course_number', name='unique_course')
+    )
+    op.create_table('course_sections',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.String(length=4), nullable=False),
+    sa.Column('course_number', sa.String(length=4), nullable=False),
+    sa.Column('course_title', sa.String(length=100), nullable=False),
+    sa.Column('section_id', sa.String(length=10), nullable=False),
+    sa.Column('instructor', sa.String(length=100), nullable=False),
+    sa.Column('days', sa.String(length=5), nullable=False),
+    sa.Column('start_time', sa.String(length=10), nullable=False),
+    sa.Column('end_time', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('course_sections')
+    op.drop_table('courses')
+    op.drop_table('registration_queue')
+    op.drop_table('users')
@@ -0,0 +1,29 @@
+"""Add catalog_state table holding the catalog version
+
+Revision ID: 0002_catalog_state
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_catalog_state'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_state = op.create_table('catalog_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(catalog_state, [{'id': 1, 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('catalog_state')
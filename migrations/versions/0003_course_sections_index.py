@@ -0,0 +1,26 @@
+"""Index course_sections on (department_id, course_number)
+
+Revision ID: 0003_course_sections_index
+Revises: 0002_catalog_state
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_course_sections_index'
+down_revision = '0002_catalog_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course_sections', schema=None) as batch_op:
+        batch_op.create_index('ix_course_sections_course', ['department_id', 'course_number'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('course_sections', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_sections_course')
@@ -0,0 +1,78 @@
+"""Add normalized meeting columns to course_sections
+
+Revision ID: 0004_section_meeting_columns
+Revises: 0003_course_sections_index
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_section_meeting_columns'
+down_revision = '0003_course_sections_index'
+branch_labels = None
+depends_on = None
+
+DAYS = 'MTWRFSU'
+
+
+def _meeting_columns(days, start_time, end_time):
+    """Parse one row's meeting fields, or return None if they are malformed."""
+    day_mask = 0
+    for day in days or '':
+        index = DAYS.find(day.upper())
+        if index < 0:
+            return None
+        day_mask |= 1 << index
+    minutes = []
+    for value in (start_time, end_time):
+        text = (value or '').strip()
+        if not text.isdigit() or not 3 <= len(text) <= 4:
+            return None
+        hours, mins = divmod(int(text), 100)
+        if mins >= 60 or hours > 24:
+            return None
+        minutes.append(hours * 60 + mins)
+    if not day_mask or minutes[1] <= minutes[0]:
+        return None
+    return {'day_mask': day_mask, 'start_minute': minutes[0], 'end_minute': minutes[1]}
+
+
+def upgrade():
+    with op.batch_alter_table('course_sections', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('day_mask', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('start_minute', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('end_minute', sa.SmallInteger(), nullable=True))
+
+    # Backfill existing rows; malformed ones stay NULL and are parsed on read
+    connection = op.get_bind()
+    sections = sa.table(
+        'course_sections',
+        sa.column('id', sa.Integer), sa.column('days', sa.String),
+        sa.column('start_time', sa.String), sa.column('end_time', sa.String),
+        sa.column('day_mask', sa.SmallInteger), sa.column('start_minute', sa.SmallInteger),
+        sa.column('end_minute', sa.SmallInteger)
+    )
+    updates = []
+    for row in connection.execute(sa.select(sections.c.id, sections.c.days, sections.c.start_time, sections.c.end_time)):
+        columns = _meeting_columns(row.days, row.start_time, row.end_time)
+        if columns is not None:
+            updates.append(dict(columns, row_id=row.id))
+    if updates:
+        connection.execute(
+            sections.update().where(sections.c.id == sa.bindparam('row_id')).values(
+                day_mask=sa.bindparam('day_mask'),
+                start_minute=sa.bindparam('start_minute'),
+                end_minute=sa.bindparam('end_minute')
+            ),
+            updates
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('course_sections', schema=None) as batch_op:
+        batch_op.drop_column('end_minute')
+        batch_op.drop_column('start_minute')
+        batch_op.drop_column('day_mask')
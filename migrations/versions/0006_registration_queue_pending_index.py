@@ -0,0 +1,26 @@
+"""Index pending registration requests
+
+Revision ID: 0006_registration_queue_pending_index
+Revises: 0005_email_outbox
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_registration_queue_pending_index'
+down_revision = '0005_email_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('registration_queue', schema=None) as batch_op:
+        batch_op.create_index('ix_registration_queue_pending', ['approved', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('registration_queue', schema=None) as batch_op:
+        batch_op.drop_index('ix_registration_queue_pending')
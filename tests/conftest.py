@@ -0,0 +1,50 @@
+import pytest
+from backend import create_backend
+from backend.extensions import db
+from backend.models.user import User, UserType
+from benchmarks.catalog import sample_sections
+
+
+@pytest.fixture
+def app():
+    app = create_backend({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SECRET_KEY': 'test-secret',
+        'EMAIL_VERIFICATION_SALT': 'test-salt',
+        'MAIL_SUPPRESS_SEND': True,
+        'MAIL_OUTBOX_THREAD': False,
+        'BCRYPT_LOG_ROUNDS': 4,
+    })
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    response = client.post('/api/catalog/courses/sections', json=sample_sections())
+    assert response.status_code == 201
+    return client
+
+
+
+@pytest.fixture
+def make_user(app):
+    """Return a factory that creates a user and returns ``(user_id, Authorization headers)``."""
+    def make(email, user_type=UserType.ADMIN, verified=True):
+        with app.app_context():
+            user = User(email=email, password='test-password', user_type=user_type, verified=verified)
+            db.session.add(user)
+            db.session.commit()
+            token, _ = user.generate_token()
+            return user.id, {'Authorization': f'Bearer {token}'}
+    return make
+
+
+@pytest.fixture
+def admin_headers(make_user):
+    return make_user('admin@example.com')[1]
@@ -0,0 +1,32 @@
+from backend.extensions import db
+from backend.models.user import User, UserType
+
+
+def test_demoted_admin_is_locked_out_at_once(app, client, make_user):
+    user_id, headers = make_user('demoted@example.com')
+    assert client.get('/api/queue', headers=headers).status_code == 200
+
+    with app.app_context():
+        db.session.get(User, user_id).user_type = UserType.STUDENT
+        db.session.commit()
+    assert client.get('/api/queue', headers=headers).status_code == 403
+
+
+def test_deleted_admin_is_locked_out_at_once(app, client, make_user):
+    user_id, headers = make_user('deleted@example.com')
+    assert client.get('/api/queue', headers=headers).status_code == 200
+
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    assert client.get('/api/queue', headers=headers).status_code == 403
+
+
+def test_unverified_admin_is_locked_out_at_once(app, client, make_user):
+    user_id, headers = make_user('unverified@example.com')
+    assert client.get('/api/queue', headers=headers).status_code == 200
+
+    with app.app_context():
+        db.session.get(User, user_id).verified = False
+        db.session.commit()
+    assert client.get('/api/queue', headers=headers).status_code == 403
@@ -0,0 +1,13 @@
+import json
+from benchmarks.run import main
+
+
+def test_benchmark_suite_runs(tmp_path):
+    output = tmp_path / 'results.json'
+    assert main(['--sizes', 'sample', '--repeat', '1', '--bcrypt-rounds', '4', '--output', str(output)]) == 0
+    results = json.loads(output.read_text())
+    cases = results['sizes']['sample']['cases']
+    assert 'sections_all_cold' in cases and 'login' in cases
+    assert 'generate_2_courses' in cases and 'generate_2_courses_cached' in cases
+    assert main(['--sizes', 'sample', '--repeat', '1', '--bcrypt-rounds', '4', '--baseline', str(output),
+                 '--tolerance', '1000']) == 0
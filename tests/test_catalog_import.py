@@ -0,0 +1,63 @@
+from backend.models.user import UserType
+
+HEADER = 'Department ID,Course #,Course Title,Sec #,Instructor,Days,Start Time,End Time\n'
+GOOD_ROWS = (
+    'CPSC,2386,Machine Learning Fundamentals,01,Conde,MW,0800,0915\n'
+    'MATH,1451,Calculus I,02,Wang,TR,0930,1045\n'
+)
+BAD_ROWS = (
+    'CPSC,2386,Machine Learning Fundamentals,01,Conde,MW,8:00 AM,9:15 AM\n'
+    'MATH,1451,Calculus I,02,Wang,TR,9:30 AM,10:45 AM\n'
+)
+
+
+def import_csv(client, body, query='', headers=None):
+    return client.post(
+        f'/api/catalog/courses/sections/import{query}', data=body, content_type='text/csv', headers=headers
+    )
+
+
+def section_count(client):
+    return len(client.get('/api/catalog/courses/sections/all').get_json())
+
+
+def test_replace_with_every_row_rejected_keeps_sections(client, admin_headers):
+    before = section_count(client)
+    response = import_csv(client, HEADER + BAD_ROWS, headers=admin_headers)
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['inserted'] == 0 and body['rejected'] == 2
+    assert section_count(client) == before
+
+
+def test_replace_with_too_many_rejected_rows_keeps_sections(client, admin_headers):
+    before = section_count(client)
+    response = import_csv(client, HEADER + GOOD_ROWS + BAD_ROWS, headers=admin_headers)
+    assert response.status_code == 400
+    assert section_count(client) == before
+
+
+def test_replace_with_valid_rows(client, admin_headers):
+    response = import_csv(client, HEADER + GOOD_ROWS, headers=admin_headers)
+    assert response.status_code == 201
+    assert response.get_json()['inserted'] == 2
+    assert section_count(client) == 2
+
+
+def test_append_with_every_row_rejected_is_reported(client, admin_headers):
+    before = section_count(client)
+    response = import_csv(client, HEADER + BAD_ROWS, '?mode=append', headers=admin_headers)
+    assert response.status_code == 201
+    assert response.get_json()['rejected'] == 2
+    assert section_count(client) == before
+
+
+def test_import_requires_a_token(client):
+    before = section_count(client)
+    assert import_csv(client, HEADER + GOOD_ROWS).status_code == 401
+    assert section_count(client) == before
+
+
+def test_import_requires_an_admin(client, make_user):
+    _, headers = make_user('student@example.com', user_type=UserType.STUDENT)
+    assert import_csv(client, HEADER + GOOD_ROWS, headers=headers).status_code == 403
@@ -0,0 +1,70 @@
+import datetime as dt
+import smtplib
+from backend.extensions import db, mail
+from backend.models import EmailOutbox, OutboxStatus
+
+
+class FlakySMTP(object):
+    """Stands in for a Flask-Mail connection; the first ``failures`` sends raise."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = 0
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def send(self, message):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        self.sent.append(message)
+
+
+def outbox_rows(app):
+    with app.app_context():
+        rows = EmailOutbox.query.all()
+        db.session.expunge_all()
+        return rows
+
+
+def test_registration_email_is_retried_with_backoff_then_sent(app, client, monkeypatch):
+    app.config.update(MAIL_USERNAME='noreply@example.com', MAIL_RETRY_BASE_DELAY=30)
+    smtp = FlakySMTP(failures=1)
+    monkeypatch.setattr(mail, 'connect', lambda: smtp)
+    runner = app.test_cli_runner()
+
+    response = client.post('/api/user/register', json={
+        'email': 'student@example.com', 'password': 'student-password', 'user_type': 'student'
+    })
+    assert response.status_code == 201
+    [queued] = outbox_rows(app)
+    assert queued.recipient == 'student@example.com'
+    assert queued.status == OutboxStatus.PENDING and queued.attempts == 0
+    assert '/api/user/verify/' in queued.body
+
+    started = dt.datetime.utcnow()
+    assert runner.invoke(args=['send-mail', '--once']).exit_code == 0
+    [failed] = outbox_rows(app)
+    assert failed.status == OutboxStatus.PENDING and failed.attempts == 1
+    assert 'Connection unexpectedly closed' in failed.last_error
+    assert dt.timedelta(seconds=29) <= failed.next_attempt_at - started <= dt.timedelta(seconds=31)
+
+    # Not due yet: the sender leaves it alone
+    assert runner.invoke(args=['send-mail', '--once']).exit_code == 0
+    assert smtp.attempts == 1
+
+    with app.app_context():
+        db.session.get(EmailOutbox, failed.id).next_attempt_at = dt.datetime.utcnow() - dt.timedelta(seconds=1)
+        db.session.commit()
+    result = runner.invoke(args=['send-mail', '--once'])
+    assert result.exit_code == 0 and 'Sent 1 messages.' in result.output
+
+    [sent] = outbox_rows(app)
+    assert sent.status == OutboxStatus.SENT and sent.sent_at is not None and sent.last_error is None
+    assert sent.attempts == 1 and smtp.attempts == 2
+    assert [message.recipients for message in smtp.sent] == [['student@example.com']]
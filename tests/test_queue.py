@@ -0,0 +1,82 @@
+from backend.extensions import db
+from backend.models.user import User, UserType, RegistrationQueue, RequestType
+from backend.routes.queue import MAX_BATCH_SIZE
+
+
+def add_pending(app, count, prefix='ta'):
+    """Queue ``count`` unverified admin registrations and return their queue ids, oldest first."""
+    with app.app_context():
+        users = [User(email=f'{prefix}{number}@example.com', user_type=UserType.ADMIN) for number in range(count)]
+        db.session.add_all(users)
+        db.session.flush()
+        requests = [RegistrationQueue(user, RequestType.ADMIN) for user in users]
+        db.session.add_all(requests)
+        db.session.commit()
+        return [request.id for request in requests]
+
+
+def test_queue_without_paging_lists_everything(app, client, admin_headers):
+    ids = add_pending(app, 105)
+    response = client.get('/api/queue', headers=admin_headers)
+    assert response.status_code == 200
+    assert [item['id'] for item in response.get_json()] == ids
+    assert 'X-Next-After-Id' not in response.headers
+
+
+def test_queue_pages_follow_next_after_id(app, client, admin_headers):
+    ids = add_pending(app, 5)
+    response = client.get('/api/queue?limit=2', headers=admin_headers)
+    assert [item['id'] for item in response.get_json()] == ids[:2]
+    assert response.headers['X-Next-After-Id'] == str(ids[1])
+
+    seen = ids[:2]
+    after_id = response.headers['X-Next-After-Id']
+    while after_id is not None:
+        response = client.get(f'/api/queue?limit=2&after_id={after_id}', headers=admin_headers)
+        seen.extend(item['id'] for item in response.get_json())
+        after_id = response.headers.get('X-Next-After-Id')
+    assert seen == ids
+
+
+def test_batch_reports_a_result_per_item(app, client, admin_headers):
+    ids = add_pending(app, 4, prefix='cohort')
+    first = client.post('/api/queue/batch', json={'items': [{'id': ids[3], 'approval_status': True}]},
+                        headers=admin_headers)
+    assert first.get_json()['approved'] == 1
+
+    response = client.post('/api/queue/batch', json={'items': [
+        {'id': ids[0], 'approval_status': True},
+        {'email': 'cohort1@example.com', 'approval_status': False},
+        {'id': ids[3], 'approval_status': True},
+        {'id': ids[-1] + 1000, 'approval_status': True},
+        {'email': 'nobody@example.com', 'approval_status': True},
+        {'id': ids[0], 'approval_status': False},
+        {'email': 'cohort2@example.com'},
+    ]}, headers=admin_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [(result['status'], result['message']) for result in body['results']] == [
+        (200, 'Request approved successfully'),
+        (200, 'Request rejected successfully'),
+        (404, 'No pending request found for this user'),
+        (404, 'No pending request found for this user'),
+        (404, 'User not found'),
+        (409, 'Request already decided earlier in this batch'),
+        (400, 'Missing required fields'),
+    ]
+    assert body['approved'] == 1 and body['rejected'] == 1
+
+    pending = client.get('/api/queue', headers=admin_headers).get_json()
+    assert [item['id'] for item in pending] == [ids[2]]
+    with app.app_context():
+        assert User.query.filter_by(email='cohort0@example.com').one().verified
+        assert not User.query.filter_by(email='cohort1@example.com').one().verified
+
+
+def test_batch_over_the_size_limit_is_rejected(app, client, admin_headers):
+    ids = add_pending(app, 1, prefix='limit')
+    items = [{'id': ids[0], 'approval_status': True}] * (MAX_BATCH_SIZE + 1)
+    response = client.post('/api/queue/batch', json={'items': items}, headers=admin_headers)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == f'At most {MAX_BATCH_SIZE} items per batch'
+    assert [item['id'] for item in client.get('/api/queue', headers=admin_headers).get_json()] == ids
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from backend.scheduling import Preferences, SearchStats, compile_meeting, iter_schedules, top_schedules
+from backend.scheduling.timegrid import idle_minutes
+from benchmarks.catalog import sample_sections
+
+COURSES = [('CPSC', '1375'), ('MATH', '1452'), ('CPSC', '2376'), ('MATH', '2310'), ('PHYS', '2321'), ('CHEM', '1402')]
+
+
+def sample_options():
+    sections = sample_sections()
+    return [
+        [
+            compile_meeting(section['days'], section['startTime'], section['endTime'],
+                            SimpleNamespace(instructor=section['instructor']))
+            for section in sections
+            if (section['departmentId'], section['courseNumber']) == course
+        ]
+        for course in COURSES
+    ]
+
+
+def brute_force_scores(section_options, preferences):
+    scores = []
+    for path in iter_schedules([[option.mask for option in options] for options in section_options]):
+        chosen = [options[index] for options, index in zip(section_options, path)]
+        days = 0
+        mask = 0
+        for option in chosen:
+            days |= option.day_bits
+            mask |= option.mask
+        scores.append(
+            sum(preferences.section_cost(option) for option in chosen)
+            + preferences.weights['days'] * days.bit_count()
+            + preferences.weights['gaps'] * idle_minutes(mask)
+        )
+    return sorted(scores)
+
+
+def test_ranked_scores_match_brute_force():
+    section_options = sample_options()
+    for top_k in (1, 3, 10, 100):
+        preferences = Preferences(top_k=top_k, instructors=['Conde'])
+        ranked = top_schedules(section_options, preferences)
+        assert [score for score, _ in ranked] == brute_force_scores(section_options, preferences)[:top_k]
+
+
+def test_ranked_search_visits_fewer_nodes_than_enumeration():
+    section_options = sample_options()
+    enumerated = SearchStats()
+    for _ in iter_schedules([[option.mask for option in options] for options in section_options], stats=enumerated):
+        pass
+    ranked = SearchStats()
+    top_schedules(section_options, Preferences(top_k=3), stats=ranked)
+    assert ranked.nodes < enumerated.nodes
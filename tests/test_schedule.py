@@ -0,0 +1,181 @@
+import json
+from itertools import product
+import pytest
+from backend.scheduling import check_feasibility
+from backend.scheduling.feasibility import arc_consistency, conflicting_pairs
+from benchmarks.catalog import sample_sections
+
+COURSES = [
+    {'department_id': 'CPSC', 'course_number': '2386'},
+    {'department_id': 'MATH', 'course_number': '1451'},
+]
+LOCKED = [{'department_id': 'CPSC', 'course_number': '2386', 'section_id': '01'}]
+# Clashes with the locked CPSC 2386 section 01 (MW 0800-0915)
+CLASHING_RESERVED = [{'days': 'MW', 'start_time': '0800', 'end_time': '0900'}]
+
+
+def generate(client, reserved):
+    return client.post('/api/schedule/generate', json={
+        'courses': COURSES, 'reserved': reserved, 'locked': LOCKED
+    })
+
+
+def test_locks_emptying_reserved_do_not_poison_cache(client):
+    assert generate(client, CLASHING_RESERVED).status_code == 404
+    response = generate(client, [])
+    assert response.status_code == 200
+    assert len(response.get_json()['schedules']) == 1
+
+
+def test_locks_emptying_reserved_are_not_served_from_cache(client):
+    assert generate(client, []).status_code == 200
+    assert generate(client, CLASHING_RESERVED).status_code == 404
+
+
+def test_locked_results_match_without_cache(app, client):
+    cached = generate(client, []).get_json()
+    app.config['SCHEDULE_CACHE'] = False
+    assert generate(client, []).get_json() == cached
+
+
+def test_streamed_results_are_cached_identically(app, client):
+    body = {'courses': COURSES + [{'department_id': 'CPSC', 'course_number': '1375'}], 'reserved': []}
+    streamed = client.post('/api/schedule/generate', json=dict(body, stream=True)).get_data(as_text=True)
+    assert app.extensions['schedule_cache'].memory.size > 0
+    cached = client.post('/api/schedule/generate', json=body).get_json()
+    app.config['SCHEDULE_CACHE'] = False
+    fresh = client.post('/api/schedule/generate', json=body).get_json()
+    assert cached == fresh
+    assert len(streamed.splitlines()) == len(fresh)
+
+
+def test_ranked_results_stream_for_the_ndjson_accept_header(client):
+    request = {'courses': COURSES, 'reserved': [], 'preferences': {'top_k': 2}}
+    listed = client.post('/api/schedule/generate', json=request).get_json()
+    for response in (
+        client.post('/api/schedule/generate', json=request, headers={'Accept': 'application/x-ndjson'}),
+        client.post('/api/schedule/generate', json=dict(request, stream=True)),
+    ):
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == listed
+
+
+def brute_force(sections, courses, reserved):
+    """The original generate algorithm: every combination, then a pairwise overlap check."""
+    options = [
+        [section for section in sections
+         if (section['departmentId'], section['courseNumber']) == (course['department_id'], course['course_number'])]
+        for course in courses
+    ]
+    if reserved:
+        options.append([
+            {'departmentId': 'RESV', 'days': ''.join(block['days']),
+             'startTime': block['start_time'], 'endTime': block['end_time']}
+            for block in reserved
+        ])
+
+    def overlaps(schedule):
+        for i in range(len(schedule)):
+            for j in range(i + 1, len(schedule)):
+                if not set(schedule[i]['days']) & set(schedule[j]['days']):
+                    continue
+                if (int(schedule[i]['startTime']) < int(schedule[j]['endTime'])
+                        and int(schedule[i]['endTime']) > int(schedule[j]['startTime'])):
+                    return True
+        return False
+
+    return [{
+        'sections': [{
+            'department_id': section['departmentId'],
+            'course_number': section['courseNumber'],
+            'section_id': section['sectionId'],
+            'instructor': section['instructor'],
+            'days': list(section['days']),
+            'start_time': section['startTime'],
+            'end_time': section['endTime']
+        } for section in schedule if section['departmentId'] != 'RESV']
+    } for schedule in product(*options) if not overlaps(schedule)]
+
+
+# CPSC 1375 has two rows for section 04 (TR and W) and, like MATH 1452, a Wednesday-only section
+BRUTE_FORCE_CASES = [
+    ([('CPSC', '1375'), ('MATH', '1452')], []),
+    ([('CPSC', '1375'), ('MATH', '1452'), ('CPSC', '2386'), ('MATH', '1451')], []),
+    ([('CPSC', '1375'), ('MATH', '1452')], [{'days': 'W', 'start_time': '0900', 'end_time': '1000'}]),
+    ([('MATH', '1452'), ('CPSC', '1375'), ('CSEC', '2310')],
+     [{'days': 'TR', 'start_time': '1200', 'end_time': '1300'}, {'days': 'F', 'start_time': '0800', 'end_time': '1700'}]),
+]
+
+
+@pytest.mark.parametrize('courses, reserved', BRUTE_FORCE_CASES)
+def test_generate_matches_brute_force(app, client, courses, reserved):
+    courses = [{'department_id': department, 'course_number': number} for department, number in courses]
+    expected = brute_force(sample_sections(), courses, reserved)
+    assert expected
+    for cache in (False, True, True):
+        app.config['SCHEDULE_CACHE'] = cache
+        response = client.post('/api/schedule/generate', json={'courses': courses, 'reserved': reserved})
+        assert response.status_code == 200
+        assert response.get_json() == expected
+
+
+FOUR_COURSES = [
+    {'department_id': department, 'course_number': number}
+    for department, number in BRUTE_FORCE_CASES[1][0]
+]
+
+
+def test_count_matches_generate(client):
+    expected = len(brute_force(sample_sections(), FOUR_COURSES, []))
+    body = client.post('/api/schedule/generate/count', json={'courses': FOUR_COURSES, 'reserved': []}).get_json()
+    assert body == {'feasible': True, 'count': expected, 'capped': False, 'conflicts': []}
+
+    capped = client.post('/api/schedule/generate/count', json={
+        'courses': FOUR_COURSES, 'reserved': [], 'cap': 5
+    }).get_json()
+    assert capped['feasible'] and capped['capped'] and capped['count'] == 5
+
+
+def test_count_reports_conflicting_pairs(client):
+    body = client.post('/api/schedule/generate/count', json={
+        'courses': COURSES,
+        'reserved': [{'days': 'MTWRF', 'start_time': '0000', 'end_time': '2400'}]
+    }).get_json()
+    assert body['feasible'] is False and body['count'] == 0
+    assert body['conflicts'] == [[course, {'reserved': True}] for course in COURSES]
+
+
+def test_arc_consistency_proves_infeasibility_without_a_conflicting_pair():
+    # Every pair of groups fits together, but the first forces the second onto
+    # 0b010, which the third needs too
+    groups = [[0b001], [0b001, 0b010], [0b010]]
+    assert conflicting_pairs(groups) == []
+    assert [] in arc_consistency(groups)
+    assert check_feasibility(groups) == (False, 0, False, [])
+
+
+def test_cursor_pages_resume_the_search(client):
+    request = {'courses': FOUR_COURSES, 'reserved': [], 'limit': 5}
+    seen = []
+    cursor = None
+    while True:
+        page = client.post('/api/schedule/generate', json=dict(request, cursor=cursor)).get_json()
+        seen.extend(page['schedules'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == brute_force(sample_sections(), FOUR_COURSES, [])
+
+
+def test_cursor_is_signed_and_tied_to_its_request(client):
+    request = {'courses': FOUR_COURSES, 'reserved': [], 'limit': 5}
+    cursor = client.post('/api/schedule/generate', json=request).get_json()['next_cursor']
+
+    tampered = client.post('/api/schedule/generate', json=dict(request, cursor=cursor[:-2] + 'xx'))
+    assert tampered.status_code == 400
+    assert tampered.get_json()['message'] == 'Invalid cursor'
+
+    other = client.post('/api/schedule/generate', json=dict(request, courses=FOUR_COURSES[:3], cursor=cursor))
+    assert other.status_code == 400
+    assert other.get_json()['message'] == 'Cursor does not match this request'